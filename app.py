@@ -15,57 +15,113 @@ Funcionalidades Principais:
 """
 
 import math
-import re
-import traceback
+import json
+import base64
+import hashlib
+import logging
 import os # Adicionado para compatibilidade de deploy
-from flask import Flask, render_template, request, url_for, session, redirect
-
-# --- Importação SEGURA do Módulo de Cálculos ---
-MODULO_CALCULOS_OK = False
-tabelas_madeira = {}
-kmod1_valores, kmod2_valores, TOL = {}, {}, 1e-9
-GAMMA_M, GAMMA_C, GAMMA_T, GAMMA_V = 1.4, 1.4, 1.4, 1.8
-
-try:
-    from calculos_madeira import (
-        tabelas_madeira, kmod1_valores, kmod2_valores,
-        GAMMA_M, GAMMA_C, GAMMA_T, GAMMA_V, TOL,
-        calcular_propriedades_geometricas, obter_propriedades_madeira,
-        calcular_kmod, calcular_kmod1, calcular_kmod2,
-        calcular_f_t0d, calcular_f_t90d, calcular_f_c0d,
-        calcular_f_c90d, calcular_f_vd, calcular_f_md,
-        obter_E0_med, obter_E0_05, obter_E0_ef,
-        obter_G_med,
-        verificar_dimensoes_minimas, verificar_tracao_simples,
-        verificar_compressao_axial_com_estabilidade,
-        verificar_flexocompressao_resistencia,
-        verificar_flexocompressao_com_estabilidade,
-        verificar_flexotracao,
-        verificar_flexao_simples_reta,
-        verificar_flexao_obliqua,
-        verificar_cisalhamento,
-        verificar_compressao_perpendicular,
-        verificar_estabilidade_lateral_viga,
-        calcular_flecha_instantanea_biapoiada_distribuida,
-        obter_coeficiente_fluencia,
-        verificar_flecha_final,
-        verificar_flecha_instantanea_outra_comb
-    )
-    MODULO_CALCULOS_OK = True
-    print("INFO: Módulo 'calculos_madeira.py' carregado com sucesso.")
-except ImportError as e:
-    MODULO_CALCULOS_OK = False
-    print("*"*60); print(" ERRO CRÍTICO: Falha ao importar 'calculos_madeira.py'."); print(f" Detalhe: {e}"); print("*"*60)
-except Exception as e_geral:
-    MODULO_CALCULOS_OK = False
-    print("*"*60); print(f" ERRO CRÍTICO INESPERADO durante a importação: {type(e_geral).__name__}"); print(f" Detalhe: {e_geral}"); print("*"*60)
+from functools import lru_cache
+from types import MappingProxyType
+from jinja2 import FileSystemBytecodeCache
+from flask import Flask, render_template, make_response, request, url_for, session, redirect
+
+# --- Importação do Módulo de Cálculos ---
+# Sem fallback: se 'calculos_madeira.py' não puder ser importado, a aplicação não deve subir.
+from calculos_madeira import (
+    tabelas_madeira, kmod1_valores, kmod2_valores,
+    GAMMA_M, GAMMA_C, GAMMA_T, GAMMA_V, TOL,
+    calcular_propriedades_geometricas, obter_propriedades_madeira,
+    calcular_kmod, calcular_kmod1, calcular_kmod2,
+    calcular_f_t0d, calcular_f_t90d, calcular_f_c0d,
+    calcular_f_c90d, calcular_f_vd, calcular_f_md,
+    obter_E0_med, obter_E0_05, obter_E0_ef,
+    obter_G_med,
+    verificar_dimensoes_minimas, verificar_tracao_simples,
+    verificar_compressao_axial_com_estabilidade,
+    verificar_flexocompressao_resistencia,
+    verificar_flexocompressao_com_estabilidade,
+    verificar_flexotracao,
+    verificar_flexao_simples_reta,
+    verificar_flexao_obliqua,
+    verificar_cisalhamento,
+    verificar_compressao_perpendicular,
+    verificar_estabilidade_lateral_viga,
+    calcular_flechas_instantaneas_biapoiada_distribuida,
+    obter_coeficiente_fluencia,
+    verificar_flecha_final,
+    verificar_flecha_instantanea_outra_comb
+)
+
+# --- Opções válidas dos campos de seleção (montadas uma única vez na importação) ---
+_VALID_TIPOS = frozenset(tabelas_madeira)
+_VALID_CLASSES = {tipo: frozenset(classes) for tipo, classes in tabelas_madeira.items()}
+_VALID_KMOD1 = frozenset(kmod1_valores)
+_VALID_KMOD2 = frozenset(kmod2_valores)
+_VALID_TIPO_PECA = frozenset(("principal_isolada", "secundaria_isolada", "principal_multipla", "secundaria_multipla"))
+_VALID_BETA_C = frozenset(('serrada', 'mlc'))
+# Parâmetros que dependem do tipo de madeira: (tipo para kmod/fluência, beta_c, divisor de L para a excentricidade mínima)
+_PARAMETROS_MADEIRA = {'serrada': ('serrada', 0.2, 300.0), 'mlc': ('mlc', 0.1, 500.0)}
+_PARAMETROS_MADEIRA_OUTRA = ('serrada', 0.2, 500.0) # tipo não listado (o relatório detalhado não restringe as opções)
 
 app = Flask(__name__)
 
+# Mensagens de depuração passam pelo logging; o nível vem de LOG_LEVEL (padrão: INFO)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format='%(levelname)s: %(message)s')
+_log = logging.getLogger(__name__)
+
+# Configuração do servidor lida uma única vez na importação (compartilhada pelos workers sob --preload)
+PORTA_APP = int(os.environ.get("PORT", 5000))
+MODO_DEBUG = os.environ.get("FLASK_ENV") == "development"
+
+# --- Consultas às tabelas com cache ---
+# As entradas são categóricas (poucas dezenas de combinações), então o resultado de cada
+# consulta é memorizado (as consultas de tabela e kmod já são memorizadas em calculos_madeira).
+# Entradas inválidas continuam levantando exceção (não são cacheadas).
+@lru_cache(maxsize=256)
+def _material_especializado(tipo_tabela, classe_madeira, classe_carregamento, classe_umidade, tipo_madeira_beta_c):
+    """
+    Calcula, uma única vez por combinação das entradas categóricas, tudo o que depende apenas
+    do material: kmod, resistências características e de cálculo, módulos de elasticidade e beta_c.
+    f_c90d fica de fora por depender de alpha_n (entrada numérica).
+
+    Returns:
+        MappingProxyType: Valores a serem copiados para resultados['calculos'].
+    """
+    props_mad = MappingProxyType(obter_propriedades_madeira(tipo_tabela, classe_madeira))
+    tipo_mad_kmod, beta_c, _ = _PARAMETROS_MADEIRA.get(tipo_madeira_beta_c, _PARAMETROS_MADEIRA_OUTRA)
+    kmod1 = calcular_kmod1(classe_carregamento, tipo_mad_kmod); kmod2 = calcular_kmod2(classe_umidade, tipo_mad_kmod)
+    k_mod = kmod1 * kmod2
+    mat = {'props_mad': props_mad, 'kmod1': kmod1, 'kmod2': kmod2, 'k_mod': k_mod}
+    # As tabelas trazem todas as resistências características; chave ausente falha aqui com KeyError
+    f_t0k = props_mad['f_t0k']; f_t90k = props_mad['f_t90k']; f_c0k = props_mad['f_c0k']
+    f_c90k = props_mad['f_c90k']; f_vk = props_mad['f_vk']; f_mk = props_mad['f_mk']
+    mat.update(f_t0k=f_t0k, f_t90k=f_t90k, f_c0k=f_c0k, f_c90k=f_c90k, f_vk=f_vk, f_mk=f_mk)
+    f_t0d_calculado = calcular_f_t0d(f_t0k, k_mod); f_c0d_calculado = calcular_f_c0d(f_c0k, k_mod)
+    mat['f_t0d'] = f_t0d_calculado; mat['f_c0d'] = f_c0d_calculado
+    mat['f_t90d'] = calcular_f_t90d(f_t90k, f_t0d_calculado, k_mod)
+    mat['f_vd'] = calcular_f_vd(f_vk, k_mod)
+    mat['f_md'] = calcular_f_md(f_mk, f_c0d_calculado, k_mod, tipo_tabela)
+    mat['f_md_estimado'] = (tipo_tabela == 'nativa')
+    mat['E_0med'] = obter_E0_med(props_mad); mat['E_005'] = obter_E0_05(props_mad); mat['E_0ef'] = obter_E0_ef(props_mad, k_mod); mat['G_med'] = props_mad['G_med']
+    mat['beta_c'] = beta_c
+    return MappingProxyType(mat)
+
 # --- Funções Auxiliares de Validação ---
+# Limites normativos aplicados por nome de campo em validar_float: nome -> (mínimo, máximo ou None, descrição)
+_LIMITES_NORMATIVOS = {
+    'alpha_n': (1.0, 2.0, "(αn) deve estar entre 1.0 e 2.0"),
+    'Ke_x': (0.5, None, "(Ke) deve ser >= 0.5"),
+    'Ke_y': (0.5, None, "(Ke) deve ser >= 0.5"),
+}
+
+# Caracteres que float() aceita mas que não fazem parte do formato numérico dos campos
+_CARACTERES_FORA_DO_FORMATO = frozenset('eE_+')
+
+@lru_cache(maxsize=1024)
 def validar_float(valor_str, nome_campo, permitir_zero=True, permitir_negativo=True, minimo=None, maximo=None):
     """
     Valida e converte uma string para um número float.
+    O resultado é memorizado: os mesmos textos ('0', '1.0', ...) se repetem entre campos e requisições.
 
     Args:
         valor_str (str): A string a ser validada e convertida.
@@ -81,35 +137,55 @@ def validar_float(valor_str, nome_campo, permitir_zero=True, permitir_negativo=T
     Raises:
         ValueError: Se a validação falhar.
     """
-    if valor_str is None or str(valor_str).strip() == "":
+    texto = valor_str.strip() if isinstance(valor_str, str) else ("" if valor_str is None else str(valor_str).strip())
+    if texto == "":
         if permitir_zero: return 0.0
         else: raise ValueError(f"Campo '{nome_campo}' é obrigatório e não pode ser zero.")
-    try: valor_fmt = str(valor_str).strip().replace(',', '.')
-    except AttributeError: raise ValueError(f"Entrada inválida para '{nome_campo}'. Esperado um número.")
-    regex = r'^-?\d*\.?\d+$' if permitir_negativo else r'^\d*\.?\d+$'
-    if not re.match(regex, valor_fmt): raise ValueError(f"Formato inválido para '{nome_campo}': '{valor_str}'.")
-    try:
-        valor = float(valor_fmt)
-        if not permitir_zero and abs(valor) < TOL: raise ValueError(f"Campo '{nome_campo}' não pode ser zero.")
-        if not permitir_negativo and valor < -TOL: raise ValueError(f"Campo '{nome_campo}' não pode ser negativo.")
-        if minimo is not None and valor < minimo - TOL: raise ValueError(f"Campo '{nome_campo}' ({valor:.3f}) deve ser >= {minimo:.3f}.")
-        if maximo is not None and valor > maximo + TOL: raise ValueError(f"Campo '{nome_campo}' ({valor:.3f}) deve ser <= {maximo:.3f}.")
-        if nome_campo == 'alpha_n' and (valor < 1.0 - TOL or valor > 2.0 + TOL): raise ValueError(f"Campo '{nome_campo}' (αn) deve estar entre 1.0 e 2.0.")
-        if nome_campo.startswith('Ke_') and valor < 0.5 - TOL: raise ValueError(f"Campo '{nome_campo}' (Ke) deve ser >= 0.5.")
-        return valor
-    except ValueError as e:
-        if isinstance(e, ValueError) and e.args and isinstance(e.args[0], str) and any(term in e.args[0] for term in ["obrigatório", "deve estar entre", "deve ser >=", "não pode ser zero", "não pode ser negativo", "Formato inválido"]): raise e
-        else: raise ValueError(f"Erro ao converter valor para '{nome_campo}': '{valor_str}'.") from e
+    valor_fmt = texto.replace(',', '.')
+    # Mesma gramática do formato aceito ('-'opcional, dígitos, no máximo um '.', terminando em dígito):
+    # float() aceitaria também expoente ('1e3'), '_' ('1_00'), '+' inicial e ponto final ('1.')
+    if valor_fmt[-1] == '.' or not _CARACTERES_FORA_DO_FORMATO.isdisjoint(valor_fmt) or (not permitir_negativo and valor_fmt[0] == '-'):
+        raise ValueError(f"Formato inválido para '{nome_campo}': '{valor_str}'.")
+    # float() rejeita os demais formatos inválidos; inf/nan são aceitos por ele e precisam ser barrados
+    try: valor = float(valor_fmt)
+    except ValueError: raise ValueError(f"Formato inválido para '{nome_campo}': '{valor_str}'.") from None
+    if not math.isfinite(valor): raise ValueError(f"Formato inválido para '{nome_campo}': '{valor_str}'.")
+    if not permitir_zero and abs(valor) < TOL: raise ValueError(f"Campo '{nome_campo}' não pode ser zero.")
+    if minimo is not None and valor < minimo - TOL: raise ValueError(f"Campo '{nome_campo}' ({valor:.3f}) deve ser >= {minimo:.3f}.")
+    if maximo is not None and valor > maximo + TOL: raise ValueError(f"Campo '{nome_campo}' ({valor:.3f}) deve ser <= {maximo:.3f}.")
+    limites = _LIMITES_NORMATIVOS.get(nome_campo)
+    if limites is not None:
+        lim_min, lim_max, descricao = limites
+        if valor < lim_min - TOL or (lim_max is not None and valor > lim_max + TOL): raise ValueError(f"Campo '{nome_campo}' {descricao}.")
+    return valor
+
+def _opcoes_vazias(opcoes_validas):
+    """Indica se a coleção de opções não serve para testar pertinência (vazia, string ou sem __contains__)."""
+    return isinstance(opcoes_validas, str) or not hasattr(opcoes_validas, '__contains__') or not opcoes_validas
+
+@lru_cache(maxsize=256)
+def _validar_selecao(valor_str, nome_campo, opcoes_validas):
+    """Núcleo memorizado de `validar_selecao`, sem efeitos colaterais (ver a função pública)."""
+    if not valor_str or str(valor_str).strip() == "": raise ValueError(f"Seleção para '{nome_campo}' é obrigatória.")
+    valor = str(valor_str).strip()
+    # Testa a pertinência direto na coleção recebida (O(1) para dict/set), sem materializar listas
+    if opcoes_validas is None or _opcoes_vazias(opcoes_validas): return valor
+    if valor not in opcoes_validas:
+        # Montada apenas no caminho de erro; conjuntos são ordenados para a mensagem ser estável
+        op_str = ", ".join(map(str, sorted(opcoes_validas) if isinstance(opcoes_validas, (set, frozenset)) else opcoes_validas))
+        raise ValueError(f"Valor '{valor}' inválido para '{nome_campo}'. Válidos: {op_str[:150] + '...' if len(op_str) > 150 else op_str}.")
+    return valor
 
 def validar_selecao(valor_str, nome_campo, opcoes_validas=None):
     """
     Valida se uma string de seleção é obrigatória e se está entre as opções válidas.
+    A validação é memorizada em `_validar_selecao` (por isso os argumentos precisam ser hashable);
+    o aviso de lista de opções vazia fica fora do cache e é registrado a cada chamada.
 
     Args:
         valor_str (str): O valor da seleção.
         nome_campo (str): Nome do campo para mensagens de erro.
-        opcoes_validas (list or dict, optional): Lista ou dicionário de opções válidas.
-                                                  Se dict, as chaves são consideradas válidas.
+        opcoes_validas (frozenset or tuple, optional): Coleção de opções válidas.
                                                   Default é None (apenas verifica se não é vazio).
     Returns:
         str: O valor da seleção validado e 'stripado'.
@@ -117,93 +193,362 @@ def validar_selecao(valor_str, nome_campo, opcoes_validas=None):
     Raises:
         ValueError: Se a seleção for inválida ou obrigatória e estiver vazia.
     """
-    if not valor_str or str(valor_str).strip() == "": raise ValueError(f"Seleção para '{nome_campo}' é obrigatória.")
-    valor = str(valor_str).strip()
-    if opcoes_validas is None: return valor
-    opcoes_iteraveis = list(opcoes_validas.keys()) if isinstance(opcoes_validas, dict) else list(opcoes_validas) if hasattr(opcoes_validas, '__iter__') and not isinstance(opcoes_validas, str) else []
-    if not opcoes_iteraveis: print(f"AVISO: Lista de opções válidas para '{nome_campo}' está vazia."); return valor
-    if valor not in opcoes_iteraveis: op_str = ", ".join(map(str, opcoes_iteraveis)); raise ValueError(f"Valor '{valor}' inválido para '{nome_campo}'. Válidos: {op_str[:150] + '...' if len(op_str) > 150 else op_str}.")
+    valor = _validar_selecao(valor_str, nome_campo, opcoes_validas)
+    if opcoes_validas is not None and _opcoes_vazias(opcoes_validas): _log.warning("Lista de opções válidas para '%s' está vazia.", nome_campo)
     return valor
 
+# Esquemas de validação dos campos do formulário, na ordem em que são validados.
+# Cada entrada: (chave em dados_validados, chaves de entrada em ordem de preferência, valor padrão, validador, argumentos extras).
+# 'tipo_tabela' e 'classe_madeira' ficam de fora porque as classes válidas dependem da tabela escolhida.
+_ESQUEMA_CALCULAR = (
+    ('classe_carregamento', ('classe_carregamento',), None, validar_selecao, ('Classe Carregamento', _VALID_KMOD1)),
+    ('classe_umidade', ('classe_umidade',), None, validar_selecao, ('Classe Umidade', _VALID_KMOD2)),
+    ('comprimento_m', ('comprimento',), None, validar_float, ('Comprimento (m)', False, False, 0.001)),
+    ('largura_mm', ('largura_mm',), None, validar_float, ('Largura (mm)', False, False, 0.1)),
+    ('altura_mm', ('altura_mm',), None, validar_float, ('Altura (mm)', False, False, 0.1)),
+    ('tipo_peca_dim', ('tipo_peca_dim',), None, validar_selecao, ('Tipo Peça (Dim. Mín.)', _VALID_TIPO_PECA)),
+    ('alpha_n', ('alpha_n',), '1.0', validar_float, ('alpha_n', False, False, 1.0, 2.0)),
+    ('Ke_x', ('Ke_x',), '1.0', validar_float, ('Ke_x', False, False, 0.5)),
+    ('Ke_y', ('Ke_y',), '1.0', validar_float, ('Ke_y', False, False, 0.5)),
+    ('tipo_madeira_beta_c', ('tipo_madeira_beta_c',), 'serrada', validar_selecao, ('Tipo Madeira (beta_c)', _VALID_BETA_C)),
+    ('N_sd_t0_input', ('tracao_paralela_sd',), '0', validar_float, ('Tração Paralela ELU (N)', True, False, 0.0)),
+    ('N_sd_c0_input', ('compressao_paralela_sd',), '0', validar_float, ('Compressão Paralela ELU (N)', True, False, 0.0)),
+    ('N_sd_t90_input', ('tracao_perpendicular_sd',), '0', validar_float, ('Tração Perp. ELU (N)', True, False, 0.0)),
+    ('N_sd_c90_input', ('compressao_perpendicular_sd',), '0', validar_float, ('Compressão Perp. ELU (N)', True, False, 0.0)),
+    ('V_sd_input', ('forca_cortante_sd',), '0', validar_float, ('Força Cortante ELU (N)', True, True)),
+    ('M_sd_x_Nm_input', ('momento_x_sd',), '0', validar_float, ('Momento X ELU (N.m)', True, True)),
+    ('M_sd_y_Nm_input', ('momento_y_sd',), '0', validar_float, ('Momento Y ELU (N.m)', True, True)),
+    ('L1_mm', ('L1_mm',), '0', validar_float, ('L1 (mm)', True, False, 0.0)),
+    ('carga_els_qp_x', ('carga_els_qp_x',), '0', validar_float, ('Carga ELS QP X (N/m)', True, True)),
+    ('carga_els_qp_y', ('carga_els_qp_y',), '0', validar_float, ('Carga ELS QP Y (N/m)', True, True)),
+    ('carga_els_vento_x', ('carga_els_vento_x',), '0', validar_float, ('Carga ELS Vento X (N/m)', True, True)),
+    ('carga_els_vento_y', ('carga_els_vento_y',), '0', validar_float, ('Carga ELS Vento Y (N/m)', True, True)),
+)
+# O relatório detalhado aceita também os nomes internos (ex.: 'N_sd_t0_input') e valida de forma mais branda
+_ESQUEMA_RELATORIO = (
+    ('classe_carregamento', ('classe_carregamento',), None, validar_selecao, ('Classe Carregamento', _VALID_KMOD1)),
+    ('classe_umidade', ('classe_umidade',), None, validar_selecao, ('Classe Umidade', _VALID_KMOD2)),
+    ('comprimento_m', ('comprimento', 'comprimento_m'), '0', validar_float, ('Comprimento (m)',)),
+    ('largura_mm', ('largura_mm',), '0', validar_float, ('Largura (mm)',)),
+    ('altura_mm', ('altura_mm',), '0', validar_float, ('Altura (mm)',)),
+    ('tipo_peca_dim', ('tipo_peca_dim',), 'principal_isolada', validar_selecao, ('Tipo Peça',)),
+    ('alpha_n', ('alpha_n',), '1.0', validar_float, ('alpha_n',)),
+    ('Ke_x', ('Ke_x',), '1.0', validar_float, ('Ke_x',)),
+    ('Ke_y', ('Ke_y',), '1.0', validar_float, ('Ke_y',)),
+    ('tipo_madeira_beta_c', ('tipo_madeira_beta_c',), 'serrada', validar_selecao, ('Tipo Madeira (beta_c)',)),
+    ('N_sd_t0_input', ('tracao_paralela_sd', 'N_sd_t0_input'), '0', validar_float, ('Tração Paralela',)),
+    ('N_sd_c0_input', ('compressao_paralela_sd', 'N_sd_c0_input'), '0', validar_float, ('Compressão Paralela',)),
+    ('N_sd_t90_input', ('tracao_perpendicular_sd', 'N_sd_t90_input'), '0', validar_float, ('Tração Perp.',)),
+    ('N_sd_c90_input', ('compressao_perpendicular_sd', 'N_sd_c90_input'), '0', validar_float, ('Compressão Perp.',)),
+    ('V_sd_input', ('forca_cortante_sd', 'V_sd_input'), '0', validar_float, ('Força Cortante',)),
+    ('M_sd_x_Nm_input', ('momento_x_sd', 'M_sd_x_Nm_input'), '0', validar_float, ('Momento X',)),
+    ('M_sd_y_Nm_input', ('momento_y_sd', 'M_sd_y_Nm_input'), '0', validar_float, ('Momento Y',)),
+    ('L1_mm', ('L1_mm',), '0', validar_float, ('L1',)),
+    ('carga_els_qp_x', ('carga_els_qp_x',), '0', validar_float, ('Carga QP X',)),
+    ('carga_els_qp_y', ('carga_els_qp_y',), '0', validar_float, ('Carga QP Y',)),
+    ('carga_els_vento_x', ('carga_els_vento_x',), '0', validar_float, ('Carga Vento X',)),
+    ('carga_els_vento_y', ('carga_els_vento_y',), '0', validar_float, ('Carga Vento Y',)),
+)
+
+# Campos derivados gravados junto com os validados: (chave destino, chave de origem, fator)
+_CAMPOS_DERIVADOS = (
+    ('comprimento_mm', 'comprimento_m', 1000.0),
+)
+
+# Verificações que o usuário pode selecionar no formulário
+_CHAVES_SELECIONAVEIS = ('dimensoes', 'tracao_simples', 'tracao_perpendicular', 'compressao_simples_resistencia', 'compressao_perpendicular', 'flexao_simples_reta', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento', 'estabilidade_lateral', 'flechas_els')
+
+def _mostrar_verificacoes(verificacoes_selecionadas):
+    """Monta o mapa chave -> exibir, incluindo as verificações derivadas das seleções do formulário."""
+    sel = set(verificacoes_selecionadas)
+    mostrar = {key: key in sel for key in _CHAVES_SELECIONAVEIS}
+    mostrar['compressao_estabilidade'] = 'compressao_simples_resistencia' in sel
+    mostrar['flechas_qp'] = mostrar['flechas_vento'] = 'flechas_els' in sel
+    return mostrar
+
+def validar_campos(get, esquema, dados_validados):
+    """
+    Valida os campos descritos em um esquema e os acrescenta a dados_validados,
+    junto com os campos derivados de _CAMPOS_DERIVADOS.
+
+    Args:
+        get (callable): Função de leitura dos dados de entrada (ex.: request.form.get).
+        esquema (tuple): Entradas (destino, chaves, padrão, validador, argumentos), como _ESQUEMA_CALCULAR.
+        dados_validados (dict): Dicionário que recebe os valores validados.
+
+    Returns:
+        dict: O próprio dados_validados.
+
+    Raises:
+        ValueError: Se algum campo for inválido (propagado do validador).
+    """
+    for destino, chaves, padrao, validador, args in esquema:
+        valor = padrao
+        for chave in reversed(chaves): valor = get(chave, valor) # a primeira chave presente prevalece
+        dados_validados[destino] = validador(valor, *args)
+    for destino, origem, fator in _CAMPOS_DERIVADOS: dados_validados[destino] = dados_validados[origem] * fator
+    return dados_validados
+
+def _entradas_brutas(inputs):
+    """Congela os inputs brutos de uma requisição (sem as seleções) numa tupla ordenada e hashable."""
+    return tuple(sorted((k, v) for k, v in inputs.items() if k != 'verificacoes_selecionadas'))
+
+@lru_cache(maxsize=1024)
+def validar_entradas(entradas, esquema, rotulo_classe_madeira):
+    """
+    Valida o conjunto completo de entradas de uma rota. O resultado é memorizado pelas entradas
+    brutas: ir e voltar entre o relatório resumido e o detalhado não revalida nada.
+
+    Args:
+        entradas (tuple): Pares (chave, valor) brutos, como gerados por _entradas_brutas.
+        esquema (tuple): Esquema de validação da rota (_ESQUEMA_CALCULAR ou _ESQUEMA_RELATORIO).
+        rotulo_classe_madeira (str): Nome do campo de classe da madeira nas mensagens de erro.
+
+    Returns:
+        MappingProxyType: Dados validados (somente leitura; as rotas trabalham sobre uma cópia).
+
+    Raises:
+        ValueError: Se algum campo for inválido.
+    """
+    get = dict(entradas).get
+    tipo_tabela_val = validar_selecao(get('tipo_tabela'), 'Tipo de Tabela', _VALID_TIPOS)
+    classes_validas = _VALID_CLASSES.get(tipo_tabela_val, frozenset())
+    if not classes_validas: raise ValueError(f"Nenhuma classe de madeira encontrada para o tipo de tabela '{tipo_tabela_val}'.")
+    dados_validados = {'tipo_tabela': tipo_tabela_val, 'classe_madeira': validar_selecao(get('classe_madeira'), rotulo_classe_madeira, classes_validas)}
+    return MappingProxyType(validar_campos(get, esquema, dados_validados))
+
 # --- Função Central de Cálculo ---
+# Chaves de todas as verificações e modelo inicial de cada entrada em resultados['verificacoes']
+_CHAVES_VERIF = ('dimensoes', 'tracao_simples', 'tracao_perpendicular', 'compressao_simples_resistencia', 'compressao_estabilidade', 'compressao_perpendicular', 'flexao_simples_reta', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento', 'estabilidade_lateral', 'flechas_qp', 'flechas_vento')
+_VERIF_TEMPLATE = {'verificacao_aplicavel': False, 'passou': None, 'erro': None, 'is_combined_case': False, 'esforcos': None, 'ratio_formatado': 'N/A'}
+# Verificações simples que viram "caso combinado" quando alguma das verificações "pai" é aplicável
+_PAIS_COMBINADOS = {
+    'tracao_simples': ('flexotracao',),
+    'compressao_simples_resistencia': ('flexocompressao',),
+    'compressao_estabilidade': ('flexocompressao',),
+    'flexao_simples_reta': ('flexao_obliqua', 'flexotracao', 'flexocompressao'),
+}
+
+# Verificações axiais de forma Sd <= Rd = f_d * A, executadas num único laço:
+# (chave em verificacoes, função de cálculo, chave do esforço ELU, chave da resistência em calculos)
+_VERIF_AXIAIS = (
+    ('tracao_simples', verificar_tracao_simples, 'Nsd_t0', 'f_t0d'),
+    ('tracao_perpendicular', verificar_compressao_perpendicular, 'Nsd_t90', 'f_t90d'),
+    ('compressao_perpendicular', verificar_compressao_perpendicular, 'Nsd_c90', 'f_c90d'),
+)
+
+_INF = float('inf'); _NAN = float('nan')
+
+def _razao_segura(numerador, denominador):
+    """
+    Divide `numerador` por `denominador` aplicando a política única de divisão por zero
+    usada nos termos das equações de interação e nos ratios das verificações.
+
+    Returns:
+        float: numerador / denominador; se |denominador| <= TOL, 0.0 quando o numerador
+               também é nulo e infinito caso contrário.
+    """
+    # Comparações diretas em vez de abs(): o caminho comum é só uma comparação e a divisão
+    if denominador > TOL or -denominador > TOL: return numerador / denominador
+    return 0.0 if -TOL < numerador < TOL else _INF
+
+def _razao_ou_inf(numerador, denominador):
+    """
+    Como `_razao_segura`, mas com |denominador| <= TOL o resultado é sempre infinito, mesmo com
+    numerador nulo: é a política dos termos das equações da flexocompressão.
+    """
+    if denominador > TOL or -denominador > TOL: return numerador / denominador
+    return _INF
+
+def _finite3(a, b, c):
+    """Retorna True se os três valores forem finitos (curto-circuita no primeiro inf/nan)."""
+    return math.isfinite(a) and math.isfinite(b) and math.isfinite(c)
+
+def _ratios_interacao(termo_N1, termo_N2, termo_Mx, termo_My, k_M):
+    """
+    Calcula as duas equações de interação lineares usadas nas verificações combinadas:
+    ratio1 = N1 + Mx + k_M*My e ratio2 = N2 + k_M*Mx + My.
+
+    Args:
+        termo_N1 (float): Termo normal da 1ª equação (0.0 quando não há esforço normal).
+        termo_N2 (float): Termo normal da 2ª equação (difere de termo_N1 apenas na estabilidade, kc_x x kc_y).
+        termo_Mx (float): Termo de flexão em torno de x.
+        termo_My (float): Termo de flexão em torno de y.
+        k_M (float): Coeficiente de correção para flexão.
+
+    Returns:
+        tuple: (ratio1, ratio2); cada um é infinito se algum de seus termos não for finito.
+    """
+    ratio1 = ratio2 = _INF
+    if _finite3(termo_N1, termo_Mx, termo_My):
+        ratio1 = termo_N1 + termo_Mx + k_M * termo_My
+    if _finite3(termo_N2, termo_Mx, termo_My):
+        ratio2 = termo_N2 + k_M * termo_Mx + termo_My
+    return ratio1, ratio2
+
+def _ratios_fc(sigma_Ncd, t_Mx, t_My, fc0d, kc_x, kc_y, k_M):
+    """
+    Termos e ratios da equação de interação da flexocompressão com estabilidade (Eq. 13).
+    Recebe a tensão normal e os termos de momento já calculados pelo chamador (com `_razao_ou_inf`).
+
+    Returns:
+        tuple: (termo_N_kcx, termo_N_kcy, termo_Mx, termo_My, ratio1, ratio2)
+    """
+    t_N_kcx = _razao_ou_inf(sigma_Ncd, kc_x * fc0d)
+    t_N_kcy = _razao_ou_inf(sigma_Ncd, kc_y * fc0d)
+    r1, r2 = _ratios_interacao(t_N_kcx, t_N_kcy, t_Mx, t_My, k_M)
+    return t_N_kcx, t_N_kcy, t_Mx, t_My, r1, r2
+
+def _f2(valor_num):
+    """Formata um valor finito com duas casas decimais (esforços e resistências)."""
+    return format(valor_num, '.2f')
+
+@lru_cache(maxsize=4096)
+def _fmt_finito(valor_num):
+    """Formata um float finito e não nulo com três casas (memorizado: os ratios se repetem muito)."""
+    return format(valor_num, '.3f')
+
+def _fmt_num(valor_num):
+    """Formata um valor numérico para exibição, tratando infinito e NaN."""
+    if type(valor_num) is float:
+        # x - x só é 0.0 para valores finitos; inf e nan produzem nan e não passam pelo cache.
+        # Zeros também ficam fora dele, pois 0.0 e -0.0 seriam a mesma chave.
+        if valor_num - valor_num == 0.0: return _fmt_finito(valor_num) if valor_num else format(valor_num, '.3f')
+        return "Indeterminado" if valor_num != valor_num else "Infinito"
+    if isinstance(valor_num, (int, float)):
+        if math.isinf(valor_num): return "Infinito"
+        if math.isnan(valor_num): return "Indeterminado"
+        return format(valor_num, '.3f')
+    return "N/A" # Se não for número (ex: None de um erro anterior ou cálculo não aplicável)
+
+# --- Regras do status geral (geral_ok) ---
+# Cada regra recebe (verificacoes, estado, selecionadas) e retorna True se a verificação selecionada
+# deve reprovar o resultado geral. `estado` mapeia cada chave para a tupla
+# (verificacao_aplicavel, erro, passou), lida uma única vez de cada verificação.
+_PAIS_FLEXAO_SIMPLES = _PAIS_COMBINADOS['flexao_simples_reta']
+_ESTADO_VAZIO = (False, None, None)
+
+def _estado_verificacoes(verifs):
+    """Extrai (verificacao_aplicavel, erro, passou) de cada verificação."""
+    return {k: (v.get('verificacao_aplicavel', False), v.get('erro'), v.get('passou')) for k, v in verifs.items()}
+
+def _reprovou(estado_v):
+    """True se a verificação é aplicável e teve erro ou não passou."""
+    aplicavel, erro, passou = estado_v
+    return bool(aplicavel and (erro or passou is False))
+
+def _regra_padrao(chave):
+    """Regra simples: reprova se a própria verificação reprovou."""
+    return lambda verifs, estado, sel: _reprovou(estado.get(chave, _ESTADO_VAZIO))
+
+def _regra_tracao_simples(verifs, estado, sel):
+    # Considera falha se não for um caso combinado que será coberto por um "pai" também selecionado.
+    # Se 'flexotracao' não estiver selecionada, a falha de 'tracao_simples' conta.
+    return _reprovou(estado.get('tracao_simples', _ESTADO_VAZIO)) and (not verifs['tracao_simples'].get('is_combined_case') or 'flexotracao' not in sel)
+
+def _regra_compressao(verifs, estado, sel):
+    aplic_res, erro_res, _ = estado.get('compressao_simples_resistencia', _ESTADO_VAZIO)
+    if not aplic_res: return False
+    if erro_res or estado.get('compressao_estabilidade', _ESTADO_VAZIO)[1]: return True
+    v_res = verifs['compressao_simples_resistencia']
+    return v_res.get('passou_geral_compressao_pura') is False and (not v_res.get('is_combined_case') or 'flexocompressao' not in sel)
+
+def _regra_flexao_simples_reta(verifs, estado, sel):
+    if not _reprovou(estado.get('flexao_simples_reta', _ESTADO_VAZIO)): return False
+    # Verifica se algum dos "pais" que tornariam este caso combinado foi selecionado e é aplicável
+    parent_selected = any(pai in sel and estado.get(pai, _ESTADO_VAZIO)[0] for pai in _PAIS_FLEXAO_SIMPLES)
+    return not verifs['flexao_simples_reta'].get('is_combined_case', False) or not parent_selected
+
+def _regra_flechas(verifs, estado, sel):
+    aplic_qp, erro_qp, passou_qp = estado.get('flechas_qp', _ESTADO_VAZIO)
+    aplic_vento, erro_vento, passou_vento = estado.get('flechas_vento', _ESTADO_VAZIO)
+    if not (aplic_qp or aplic_vento): return False
+    if erro_qp or erro_vento: return True
+    passou_qp_final = (not aplic_qp) or (passou_qp is True)
+    passou_vento_final = (not aplic_vento) or (passou_vento is True)
+    return not (passou_qp_final and passou_vento_final)
+
+def _regra_estabilidade_lateral(verifs, estado, sel):
+    aplicavel, erro, passou = estado.get('estabilidade_lateral', _ESTADO_VAZIO)
+    if not aplicavel: return False
+    if erro: return True
+    return not verifs['estabilidade_lateral'].get('dispensado', False) and passou is False
+
+_REGRAS_GERAL_OK = {
+    'dimensoes': _regra_padrao('dimensoes'),
+    'tracao_simples': _regra_tracao_simples,
+    'compressao_simples_resistencia': _regra_compressao,
+    'flexao_simples_reta': _regra_flexao_simples_reta,
+    'flechas_els': _regra_flechas,
+    'estabilidade_lateral': _regra_estabilidade_lateral,
+}
+_REGRAS_GERAL_OK.update({chave: _regra_padrao(chave) for chave in ('tracao_perpendicular', 'compressao_perpendicular', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento')})
+
 def realizar_calculo_completo(dados_validados):
     """
     Executa a sequência completa de cálculos e verificações da peça de madeira.
 
     Args:
         dados_validados (dict): Dicionário contendo todos os dados de entrada já validados.
+                                É consumido: os resultados são gravados nele mesmo (sem cópia).
 
     Returns:
-        dict: Dicionário contendo os dados de entrada, os resultados dos cálculos
-              intermediários e os resultados das verificações.
+        dict: O próprio `dados_validados`, acrescido dos resultados dos cálculos
+              intermediários e dos resultados das verificações.
 
     Raises:
-        ImportError: Se o módulo 'calculos_madeira' não estiver carregado.
         ValueError: Se ocorrer um erro durante os cálculos iniciais.
     """
-    print("DEBUG: --- Iniciando realizar_calculo_completo ---")
-    if not MODULO_CALCULOS_OK: raise ImportError("Módulo de cálculos não carregado.")
-    resultados = dados_validados.copy(); resultados['calculos'] = {}; resultados['verificacoes'] = {}
+    _log.debug("--- Iniciando realizar_calculo_completo ---")
+    # Helpers e constantes usados dezenas de vezes abaixo, ligados a nomes locais (LOAD_FAST)
+    fmt = _fmt_num; f2 = _f2; inf = _INF; nan = _NAN; tol = TOL
+    resultados = dados_validados # Sem cópia: as rotas montam um dict novo a cada requisição
+    calc = {} # Resultados intermediários, montados localmente e atribuídos a resultados['calculos'] uma única vez
     # A variável geral_ok será definida ao FINAL, baseada nas seleções do usuário.
-    print(f"DEBUG: realizar_calculo_completo - verificacoes_selecionadas em dados_validados: {dados_validados.get('verificacoes_selecionadas')}")
-
-    # --- Helper para formatar valores numéricos (ratios, termos, etc.) ---
-    def formatar_valor_numerico(valor_num):
-        """Formata um valor numérico para exibição, tratando infinito e NaN."""
-        if isinstance(valor_num, (int, float)):
-            if math.isinf(valor_num): return "Infinito"
-            if math.isnan(valor_num): return "Indeterminado"
-            return f"{valor_num:.3f}"
-        return "N/A" # Se não for número (ex: None de um erro anterior ou cálculo não aplicável)
+    _log.debug("realizar_calculo_completo - verificacoes_selecionadas em dados_validados: %s", dados_validados.get('verificacoes_selecionadas'))
 
     try:
         # Cálculos iniciais de propriedades geométricas e da madeira
         largura = resultados['largura_mm']; altura = resultados['altura_mm']
-        resultados['calculos']['k_M'] = 0.7 if abs(largura - altura) > TOL else 1.0 # Define k_M baseado na seção
-        geom = calcular_propriedades_geometricas(largura, altura); resultados['calculos']['geom'] = geom; resultados['espessura_min_calculada'] = min(largura, altura)
-        props_mad = obter_propriedades_madeira(resultados['tipo_tabela'], resultados['classe_madeira']); resultados['calculos']['props_mad'] = props_mad
-        tipo_mad_kmod = "mlc" if resultados['tipo_madeira_beta_c'] == 'mlc' else "serrada"
-        kmod1 = calcular_kmod1(resultados['classe_carregamento'], tipo_mad_kmod); kmod2 = calcular_kmod2(resultados['classe_umidade'], tipo_mad_kmod)
-        k_mod = kmod1 * kmod2; resultados['calculos'].update({'kmod1': kmod1, 'kmod2': kmod2, 'k_mod': k_mod}); resultados['k_mod'] = k_mod
-        f_keys = {k: props_mad.get(k) for k in ['f_t0k', 'f_t90k', 'f_c0k', 'f_c90k', 'f_vk', 'f_mk']}; resultados['calculos'].update(f_keys)
-        f_t0d_calculado = calcular_f_t0d(f_keys['f_t0k'], k_mod); f_c0d_calculado = calcular_f_c0d(f_keys['f_c0k'], k_mod)
-        f_d_values = {'f_t0d': f_t0d_calculado, 'f_c0d': f_c0d_calculado,
-                      'f_t90d': calcular_f_t90d(f_keys['f_t90k'], f_t0d_calculado, k_mod),
-                      'f_c90d': calcular_f_c90d(f_keys['f_c90k'], f_c0d_calculado, resultados.get('alpha_n', 1.0), k_mod),
-                      'f_vd': calcular_f_vd(f_keys['f_vk'], k_mod),
-                      'f_md': calcular_f_md(f_keys['f_mk'], f_c0d_calculado, k_mod, resultados['tipo_tabela'])}
-        resultados['calculos'].update(f_d_values); resultados['calculos']['f_md_estimado'] = (resultados['tipo_tabela'] == 'nativa')
-        E_vals = {'E_0med': obter_E0_med(props_mad), 'E_005': obter_E0_05(props_mad)}; E_vals['E_0ef'] = obter_E0_ef(props_mad, k_mod); E_vals['G_med'] = props_mad.get('G_med')
-        resultados['calculos'].update(E_vals); resultados['calculos']['beta_c'] = 0.1 if resultados['tipo_madeira_beta_c'] == 'mlc' else 0.2; resultados['beta_c'] = resultados['calculos']['beta_c']
-    except Exception as e: print(f"ERRO CRÍTICO cálculos iniciais: {e}"); traceback.print_exc(); raise ValueError(f"Falha cálculos iniciais: {e}") from e
+        calc['k_M'] = 0.7 if abs(largura - altura) > tol else 1.0 # Define k_M baseado na seção
+        geom = calcular_propriedades_geometricas(largura, altura); calc['geom'] = geom; resultados['espessura_min_calculada'] = min(largura, altura)
+        # Parte que depende só das entradas categóricas: calculada uma vez por combinação
+        tipo_mad_kmod, _, divisor_exc_min = _PARAMETROS_MADEIRA.get(resultados['tipo_madeira_beta_c'], _PARAMETROS_MADEIRA_OUTRA)
+        mat = _material_especializado(resultados['tipo_tabela'], resultados['classe_madeira'], resultados['classe_carregamento'], resultados['classe_umidade'], resultados['tipo_madeira_beta_c'])
+        calc.update(mat); resultados['k_mod'] = mat['k_mod']; resultados['beta_c'] = mat['beta_c']
+        calc['f_c90d'] = calcular_f_c90d(mat['f_c90k'], mat['f_c0d'], resultados['alpha_n'], mat['k_mod'])
+    except Exception as e: _log.exception("ERRO CRÍTICO cálculos iniciais: %s", e); raise ValueError(f"Falha cálculos iniciais: {e}") from e
+    resultados['calculos'] = calc
 
     # Preparação dos esforços de cálculo ELU, aplicando excentricidade mínima se necessário
     Nsd_t0_calc = resultados['N_sd_t0_input']; Nsd_c0_calc = resultados['N_sd_c0_input']; Nsd_t90_calc = resultados['N_sd_t90_input']; Nsd_c90_calc = resultados['N_sd_c90_input']
     Vsd_calc_elu = abs(resultados['V_sd_input']); M_sdx_elu_orig = resultados['M_sd_x_Nm_input'] * 1000; M_sdy_elu_orig = resultados['M_sd_y_Nm_input'] * 1000
-    resultados['calculos']['aplicou_exc_min'] = False; resultados['calculos']['e_min_mm'] = 0.0
-    if Nsd_c0_calc > TOL and abs(M_sdx_elu_orig) <= TOL and abs(M_sdy_elu_orig) <= TOL: # Se apenas compressão axial
-        e_min = resultados['comprimento_mm'] / (300.0 if resultados['tipo_madeira_beta_c'] == 'serrada' else 500.0) # Item 6.5.2 da NBR 7190
-        M_sdx_elu_final = abs(Nsd_c0_calc * e_min); M_sdy_elu_final = abs(Nsd_c0_calc * e_min) # Aplica excentricidade mínima
-        resultados['calculos'].update({'aplicou_exc_min': True, 'e_min_mm': e_min}); print(f"DEBUG: Excentricidade mínima aplicada. e_min={e_min:.2f}mm")
+    calc['aplicou_exc_min'] = False; calc['e_min_mm'] = 0.0
+    if Nsd_c0_calc > tol and abs(M_sdx_elu_orig) <= tol and abs(M_sdy_elu_orig) <= tol: # Se apenas compressão axial
+        e_min = resultados['comprimento_mm'] / divisor_exc_min # Item 6.5.2 da NBR 7190
+        M_sdx_elu_final = M_sdy_elu_final = abs(Nsd_c0_calc * e_min) # Aplica excentricidade mínima (mesmo momento nos dois eixos)
+        calc['aplicou_exc_min'] = True; calc['e_min_mm'] = e_min; _log.debug("Excentricidade mínima aplicada. e_min=%.2fmm", e_min)
     else: M_sdx_elu_final = M_sdx_elu_orig; M_sdy_elu_final = M_sdy_elu_orig
     esforcos_calculo_elu = {'Nsd_t0': Nsd_t0_calc, 'Nsd_c0': Nsd_c0_calc, 'Nsd_t90': Nsd_t90_calc, 'Nsd_c90': Nsd_c90_calc, 'Vsd': Vsd_calc_elu, 'Msdx': M_sdx_elu_final, 'Msdy': M_sdy_elu_final}
-    resultados['calculos']['esforcos_finais_elu'] = esforcos_calculo_elu; print(f"DEBUG: Esforços ELU finais: {esforcos_calculo_elu}")
+    calc['esforcos_finais_elu'] = esforcos_calculo_elu; _log.debug("Esforços ELU finais: %s", esforcos_calculo_elu)
 
     # Preparação dos esforços de cálculo ELS
     esforcos_calculo_els = {
-        'q_qp_x': resultados.get('carga_els_qp_x', 0.0) / 1000.0, # N/m para N/mm
-        'q_qp_y': resultados.get('carga_els_qp_y', 0.0) / 1000.0,
-        'q_vento_x': resultados.get('carga_els_vento_x', 0.0) / 1000.0,
-        'q_vento_y': resultados.get('carga_els_vento_y', 0.0) / 1000.0
+        'q_qp_x': resultados['carga_els_qp_x'] / 1000.0, # N/m para N/mm
+        'q_qp_y': resultados['carga_els_qp_y'] / 1000.0,
+        'q_vento_x': resultados['carga_els_vento_x'] / 1000.0,
+        'q_vento_y': resultados['carga_els_vento_y'] / 1000.0
     }
-    resultados['calculos']['esforcos_finais_els_N_mm'] = esforcos_calculo_els; print(f"DEBUG: Esforços ELS (N/mm): {esforcos_calculo_els}")
+    calc['esforcos_finais_els_N_mm'] = esforcos_calculo_els; _log.debug("Esforços ELS (N/mm): %s", esforcos_calculo_els)
 
     # Define aplicabilidade das verificações baseado nos esforços e seleções do usuário
     verificacao_flechas_selecionada = 'flechas_els' in resultados.get('verificacoes_selecionadas', [])
-    is_tension_elu = esforcos_calculo_elu['Nsd_t0'] > TOL; is_compression_elu = esforcos_calculo_elu['Nsd_c0'] > TOL
-    has_moment_x_elu = abs(esforcos_calculo_elu['Msdx']) > TOL; has_moment_y_elu = abs(esforcos_calculo_elu['Msdy']) > TOL
-    has_moment_elu = has_moment_x_elu or has_moment_y_elu; has_shear_elu = esforcos_calculo_elu['Vsd'] > TOL
-    has_perp_comp_elu = esforcos_calculo_elu['Nsd_c90'] > TOL; has_perp_tension_elu = esforcos_calculo_elu['Nsd_t90'] > TOL
+    # Flags calculadas direto dos escalares locais (sem reler o dict de esforços)
+    is_tension_elu = Nsd_t0_calc > tol; is_compression_elu = Nsd_c0_calc > tol
+    has_perp_tension_elu = Nsd_t90_calc > tol; has_perp_comp_elu = Nsd_c90_calc > tol
+    has_moment_x_elu = abs(M_sdx_elu_final) > tol; has_moment_y_elu = abs(M_sdy_elu_final) > tol
+    has_moment_elu = has_moment_x_elu or has_moment_y_elu; has_shear_elu = Vsd_calc_elu > tol
+    sem_normal_elu = not (is_tension_elu or is_compression_elu)
     aplicabilidade = {
         'dimensoes': True,
         'tracao_simples': is_tension_elu,
@@ -211,231 +556,212 @@ def realizar_calculo_completo(dados_validados):
         'compressao_simples_resistencia': is_compression_elu,
         'compressao_estabilidade': is_compression_elu, 
         'compressao_perpendicular': has_perp_comp_elu,
-        'flexao_simples_reta': has_moment_elu and not is_tension_elu and not is_compression_elu and (has_moment_x_elu ^ has_moment_y_elu), 
-        'flexao_obliqua': has_moment_x_elu and has_moment_y_elu and not is_tension_elu and not is_compression_elu,
+        'flexao_simples_reta': sem_normal_elu and (has_moment_x_elu ^ has_moment_y_elu), 
+        'flexao_obliqua': sem_normal_elu and has_moment_x_elu and has_moment_y_elu,
         'flexotracao': is_tension_elu and has_moment_elu,
         'flexocompressao': is_compression_elu and has_moment_elu,
         'cisalhamento': has_shear_elu,
         'estabilidade_lateral': has_moment_x_elu, 
-        'flechas_qp': verificacao_flechas_selecionada and (abs(esforcos_calculo_els['q_qp_x']) > TOL or abs(esforcos_calculo_els['q_qp_y']) > TOL),
-        'flechas_vento': verificacao_flechas_selecionada and (abs(esforcos_calculo_els['q_vento_x']) > TOL or abs(esforcos_calculo_els['q_vento_y']) > TOL),
+        'flechas_qp': verificacao_flechas_selecionada and (abs(esforcos_calculo_els['q_qp_x']) > tol or abs(esforcos_calculo_els['q_qp_y']) > tol),
+        'flechas_vento': verificacao_flechas_selecionada and (abs(esforcos_calculo_els['q_vento_x']) > tol or abs(esforcos_calculo_els['q_vento_y']) > tol),
     }
-    if resultados['calculos']['aplicou_exc_min']: 
+    if calc['aplicou_exc_min']: 
         aplicabilidade['flexocompressao'] = True
         aplicabilidade['compressao_simples_resistencia'] = True 
         aplicabilidade['compressao_estabilidade'] = True
         aplicabilidade['flexao_simples_reta'] = False 
         aplicabilidade['flexao_obliqua'] = False
 
-    print(f"DEBUG: realizar_calculo_completo - Aplicabilidade FINAL: {aplicabilidade}")
-
-    # Inicializa o dicionário de verificações no objeto resultados
-    chaves_todas = ['dimensoes', 'tracao_simples', 'tracao_perpendicular', 'compressao_simples_resistencia', 'compressao_estabilidade', 'compressao_perpendicular', 'flexao_simples_reta', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento', 'estabilidade_lateral', 'flechas_qp', 'flechas_vento']
-    for chave in chaves_todas:
-        resultados['verificacoes'][chave] = {
-            'verificacao_aplicavel': aplicabilidade.get(chave, False),
-            'passou': None, 'erro': None, 'is_combined_case': False,
-            'esforcos': {}, 'ratio_formatado': 'N/A'
-        }
-    # Identifica casos combinados para evitar duplicidade de alertas de reprovação
-    for chave in resultados['verificacoes']:
-        if not resultados['verificacoes'][chave]['verificacao_aplicavel']:
-            resultados['verificacoes'][chave]['is_combined_case'] = False 
-            continue
-        if chave == 'tracao_simples' and aplicabilidade.get('flexotracao', False):
-            resultados['verificacoes'][chave]['is_combined_case'] = True
-        if (chave == 'compressao_simples_resistencia' or chave == 'compressao_estabilidade') and aplicabilidade.get('flexocompressao', False):
-            resultados['verificacoes'][chave]['is_combined_case'] = True
-        if chave == 'flexao_simples_reta' and (aplicabilidade.get('flexao_obliqua', False) or aplicabilidade.get('flexotracao', False) or aplicabilidade.get('flexocompressao', False)):
-            resultados['verificacoes'][chave]['is_combined_case'] = True
+    _log.debug("realizar_calculo_completo - Aplicabilidade FINAL: %s", aplicabilidade)
+
+    # Inicializa o dicionário de verificações no objeto resultados, já identificando os casos
+    # combinados (evita duplicidade de alertas de reprovação) na mesma passada
+    verifs = {}
+    for chave in _CHAVES_VERIF:
+        aplicavel = aplicabilidade.get(chave, False)
+        pais = _PAIS_COMBINADOS.get(chave)
+        combinado = aplicavel and pais is not None and any(aplicabilidade[pai] for pai in pais)
+        verifs[chave] = dict(_VERIF_TEMPLATE, verificacao_aplicavel=aplicavel, esforcos={}, is_combined_case=combinado)
+    resultados['verificacoes'] = verifs
 
     # --- Execução das Verificações ---
-    k_M_usar = resultados['calculos'].get('k_M', 0.7) 
-    calc_data = resultados['calculos']
+    k_M_usar = calc['k_M']
+    calc_data = calc
     geom = calc_data['geom']
-    verifs = resultados['verificacoes'] 
     esforcos_elu = calc_data['esforcos_finais_elu']
     esforcos_els = calc_data['esforcos_finais_els_N_mm']
+    # Esforços, geometria e resistências usados pelas verificações, lidos uma única vez. Os dicts
+    # continuam em calculos para os templates; aqui só se evitam as buscas repetidas.
+    Nsd_t0 = esforcos_elu['Nsd_t0']; Nsd_c0 = esforcos_elu['Nsd_c0']; abs_Nsd_c0 = abs(Nsd_c0)
+    Msdx = esforcos_elu['Msdx']; Msdy = esforcos_elu['Msdy']; abs_Msdx = abs(Msdx); abs_Msdy = abs(Msdy)
+    area = geom['area']; Wx = geom['W_x']; Wy = geom['W_y']; i_x = geom['i_x']; i_y = geom['i_y']
+    f_md = calc_data['f_md']; f_c0d = calc_data['f_c0d']; f_t0d = calc_data['f_t0d']
+    f_c0k = calc_data['f_c0k']; E_005 = calc_data['E_005']; beta_c = calc_data['beta_c']
+    comprimento_mm = resultados['comprimento_mm']; Ke_x = resultados['Ke_x']; Ke_y = resultados['Ke_y']
+
+    # Só executa as verificações aplicáveis que o usuário selecionou; a aplicabilidade das demais
+    # continua registrada (é usada para identificar casos combinados no geral_ok)
+    selecionadas = set(resultados.get('verificacoes_selecionadas', ()))
+    def executar(chave): return verifs[chave]['verificacao_aplicavel'] and chave in selecionadas
 
     # Bloco de verificações ELU
-    if verifs['dimensoes']['verificacao_aplicavel']:
+    if executar('dimensoes'):
         try:
             a_ok, e_ok, a_req, e_req = verificar_dimensoes_minimas(resultados['largura_mm'], resultados['altura_mm'], resultados['tipo_peca_dim'])
             verifs['dimensoes'].update({'area_ok': a_ok, 'espessura_ok': e_ok, 'passou': a_ok and e_ok, 'area_req': a_req, 'espessura_req': e_req})
         except Exception as e: verifs['dimensoes'].update({'passou': False, 'erro': str(e)})
 
-    if verifs['tracao_simples']['verificacao_aplicavel']:
+    # Verificações axiais Sd/Rd (tração paralela, tração e compressão perpendiculares); a área
+    # de apoio da compressão perpendicular é a área total da seção
+    for chave, funcao_verif, chave_esforco, chave_resist in _VERIF_AXIAIS:
+        v = verifs[chave]
+        if not executar(chave): continue
         try:
-            p, nsd, nrd, ratio_num = verificar_tracao_simples(esforcos_elu['Nsd_t0'], geom['area'], calc_data['f_t0d'])
-            verifs['tracao_simples'].update({'passou': p, 'Nsd': nsd, 'NRd': nrd, 'Nsd_formatado': f"{nsd:.2f}", 'NRd_formatado': f"{nrd:.2f}", 'ratio': ratio_num, 'ratio_formatado': formatar_valor_numerico(ratio_num)})
-        except Exception as e: verifs['tracao_simples'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'Nsd_formatado': "Erro", 'NRd_formatado': "Erro"})
+            p, nsd, nrd, ratio_num = funcao_verif(esforcos_elu[chave_esforco], area, calc_data[chave_resist])
+            v['passou'] = p; v['Nsd'] = nsd; v['NRd'] = nrd; v['Nsd_formatado'] = f2(nsd); v['NRd_formatado'] = f2(nrd); v['ratio'] = ratio_num; v['ratio_formatado'] = fmt(ratio_num)
+            if chave == 'compressao_perpendicular': v['Area_apoio_usada'] = area
+        except Exception as e: v.update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'Nsd_formatado': "Erro", 'NRd_formatado': "Erro"})
 
-    if verifs['tracao_perpendicular']['verificacao_aplicavel']:
+    if executar('compressao_simples_resistencia'):
         try:
-            p, nsd, nrd, ratio_num = verificar_compressao_perpendicular(esforcos_elu['Nsd_t90'], geom['area'], calc_data['f_t90d']) 
-            verifs['tracao_perpendicular'].update({'passou': p, 'Nsd': nsd, 'NRd': nrd, 'Nsd_formatado': f"{nsd:.2f}", 'NRd_formatado': f"{nrd:.2f}", 'ratio': ratio_num, 'ratio_formatado': formatar_valor_numerico(ratio_num)})
-        except Exception as e: verifs['tracao_perpendicular'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'Nsd_formatado': "Erro", 'NRd_formatado': "Erro"})
-
-    if verifs['compressao_simples_resistencia']['verificacao_aplicavel']:
-        try:
-            res_comp = verificar_compressao_axial_com_estabilidade(esforcos_elu['Nsd_c0'], geom['area'], calc_data['f_c0k'], calc_data['f_c0d'], calc_data['E_005'], resultados['comprimento_mm'], resultados['Ke_x'], resultados['Ke_y'], props_geom=geom, beta_c=calc_data['beta_c'])
+            res_comp = verificar_compressao_axial_com_estabilidade(Nsd_c0, area, f_c0k, f_c0d, E_005, comprimento_mm, Ke_x, Ke_y, i_x=i_x, i_y=i_y, beta_c=beta_c)
             nsd_comp, NRd_res_comp, NRd_est_comp = res_comp[1], res_comp[3], res_comp[5]
-            ratio_res_comp_num = nsd_comp / NRd_res_comp if abs(NRd_res_comp) > TOL else (0.0 if abs(nsd_comp) < TOL else float('inf'))
-            ratio_est_comp_num = nsd_comp / NRd_est_comp if abs(NRd_est_comp) > TOL else (0.0 if abs(nsd_comp) < TOL else float('inf'))
+            ratio_res_comp_num = _razao_segura(nsd_comp, NRd_res_comp)
+            ratio_est_comp_num = _razao_segura(nsd_comp, NRd_est_comp)
 
-            verifs['compressao_simples_resistencia'].update({'passou': res_comp[2], 'Nsd': nsd_comp, 'NRd': NRd_res_comp, 'Nsd_formatado': f"{nsd_comp:.2f}", 'NRd_res_formatado': f"{NRd_res_comp:.2f}", 'ratio': ratio_res_comp_num, 'ratio_formatado': formatar_valor_numerico(ratio_res_comp_num), 'passou_geral_compressao_pura': res_comp[0]})
+            verifs['compressao_simples_resistencia'].update({'passou': res_comp[2], 'Nsd': nsd_comp, 'NRd': NRd_res_comp, 'Nsd_formatado': f2(nsd_comp), 'NRd_res_formatado': f2(NRd_res_comp), 'ratio': ratio_res_comp_num, 'ratio_formatado': fmt(ratio_res_comp_num), 'passou_geral_compressao_pura': res_comp[0]})
             verifs['compressao_estabilidade'].update({
                 'verificacao_aplicavel': True, 
-                'passou': res_comp[4], 'Nsd': nsd_comp, 'NRd': NRd_est_comp, 'Nsd_formatado': f"{nsd_comp:.2f}", 'NRd_est_formatado': f"{NRd_est_comp:.2f}",
+                'passou': res_comp[4], 'Nsd': nsd_comp, 'NRd': NRd_est_comp, 'Nsd_formatado': f2(nsd_comp), 'NRd_est_formatado': f2(NRd_est_comp),
                 'lambda_x': res_comp[6], 'lambda_y': res_comp[7], 'lambda_rel_x': res_comp[8], 'lambda_rel_y': res_comp[9],
                 'kc_x': res_comp[10], 'kc_y': res_comp[11], 'esbeltez_ok': res_comp[12], 'lambda_max': max(res_comp[6],res_comp[7]),
-                'kc_min': min(res_comp[10],res_comp[11]), 'passou_est_apenas':res_comp[13], 'ratio': ratio_est_comp_num, 'ratio_formatado': formatar_valor_numerico(ratio_est_comp_num)
+                'kc_min': min(res_comp[10],res_comp[11]), 'passou_est_apenas':res_comp[13], 'ratio': ratio_est_comp_num, 'ratio_formatado': fmt(ratio_est_comp_num)
             })
         except Exception as e:
             verifs['compressao_simples_resistencia'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"});
             verifs['compressao_estabilidade'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"});
 
-    if verifs['compressao_perpendicular']['verificacao_aplicavel']:
-        try:
-            area_apoio_compressao_perp = geom['area'] 
-            p, nsd, nrd, ratio_num = verificar_compressao_perpendicular(esforcos_elu['Nsd_c90'], area_apoio_compressao_perp, calc_data['f_c90d'])
-            verifs['compressao_perpendicular'].update({'passou': p, 'Nsd': nsd, 'NRd': nrd, 'Nsd_formatado': f"{nsd:.2f}", 'NRd_formatado': f"{nrd:.2f}",'Area_apoio_usada': area_apoio_compressao_perp, 'ratio': ratio_num, 'ratio_formatado': formatar_valor_numerico(ratio_num)})
-        except Exception as e: verifs['compressao_perpendicular'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'Nsd_formatado': "Erro", 'NRd_formatado': "Erro"})
-
-    if verifs['flexao_simples_reta']['verificacao_aplicavel']:
+    v_fsr = verifs['flexao_simples_reta'] # Aliases locais evitam reler a cadeia de dicts
+    if executar('flexao_simples_reta'):
         passou_flex_x, passou_flex_y = True, True
         erro_flex_x, erro_flex_y = None, None
-        verifs['flexao_simples_reta']['x'] = {'verificacao_aplicavel': False, 'passou': True, 'ratio_formatado': 'N/A', 'Msd_formatado': 'N/A', 'MRd_formatado': 'N/A'}
-        verifs['flexao_simples_reta']['y'] = {'verificacao_aplicavel': False, 'passou': True, 'ratio_formatado': 'N/A', 'Msd_formatado': 'N/A', 'MRd_formatado': 'N/A'}
+        v_fsr['x'] = v_fsr_x = {'verificacao_aplicavel': False, 'passou': True, 'ratio_formatado': 'N/A', 'Msd_formatado': 'N/A', 'MRd_formatado': 'N/A'}
+        v_fsr['y'] = v_fsr_y = {'verificacao_aplicavel': False, 'passou': True, 'ratio_formatado': 'N/A', 'Msd_formatado': 'N/A', 'MRd_formatado': 'N/A'}
 
-        if abs(esforcos_elu['Msdx']) > TOL: 
-            verifs['flexao_simples_reta']['x']['verificacao_aplicavel'] = True
+        if abs_Msdx > tol: 
+            v_fsr_x['verificacao_aplicavel'] = True
             try:
-                px, msdx, mrx, ratio_x_num = verificar_flexao_simples_reta(esforcos_elu['Msdx'], geom['W_x'], calc_data['f_md'])
-                verifs['flexao_simples_reta']['x'].update({'passou': px, 'Msd': msdx, 'MRd': mrx, 'Msd_formatado': f"{msdx:.2f}", 'MRd_formatado': f"{mrx:.2f}", 'ratio': ratio_x_num, 'ratio_formatado': formatar_valor_numerico(ratio_x_num)})
+                px, msdx, mrx, ratio_x_num = verificar_flexao_simples_reta(Msdx, Wx, f_md)
+                v_fsr_x['passou'] = px; v_fsr_x['Msd'] = msdx; v_fsr_x['MRd'] = mrx; v_fsr_x['Msd_formatado'] = f2(msdx); v_fsr_x['MRd_formatado'] = f2(mrx); v_fsr_x['ratio'] = ratio_x_num; v_fsr_x['ratio_formatado'] = fmt(ratio_x_num)
                 if not px: passou_flex_x = False
-            except Exception as e: erro_flex_x = str(e); passou_flex_x = False; verifs['flexao_simples_reta']['x'].update({'passou': False, 'erro': erro_flex_x, 'ratio_formatado': "Erro"})
+            except Exception as e: erro_flex_x = str(e); passou_flex_x = False; v_fsr_x.update({'passou': False, 'erro': erro_flex_x, 'ratio_formatado': "Erro"})
 
-        if abs(esforcos_elu['Msdy']) > TOL: 
-            verifs['flexao_simples_reta']['y']['verificacao_aplicavel'] = True
+        if abs_Msdy > tol: 
+            v_fsr_y['verificacao_aplicavel'] = True
             try:
-                 py, msdy, mry, ratio_y_num = verificar_flexao_simples_reta(esforcos_elu['Msdy'], geom['W_y'], calc_data['f_md'])
-                 verifs['flexao_simples_reta']['y'].update({'passou': py, 'Msd': msdy, 'MRd': mry, 'Msd_formatado': f"{msdy:.2f}", 'MRd_formatado': f"{mry:.2f}", 'ratio': ratio_y_num, 'ratio_formatado': formatar_valor_numerico(ratio_y_num)})
+                 py, msdy, mry, ratio_y_num = verificar_flexao_simples_reta(Msdy, Wy, f_md)
+                 v_fsr_y['passou'] = py; v_fsr_y['Msd'] = msdy; v_fsr_y['MRd'] = mry; v_fsr_y['Msd_formatado'] = f2(msdy); v_fsr_y['MRd_formatado'] = f2(mry); v_fsr_y['ratio'] = ratio_y_num; v_fsr_y['ratio_formatado'] = fmt(ratio_y_num)
                  if not py: passou_flex_y = False
-            except Exception as e: erro_flex_y = str(e); passou_flex_y = False; verifs['flexao_simples_reta']['y'].update({'passou': False, 'erro': erro_flex_y, 'ratio_formatado': "Erro"})
+            except Exception as e: erro_flex_y = str(e); passou_flex_y = False; v_fsr_y.update({'passou': False, 'erro': erro_flex_y, 'ratio_formatado': "Erro"})
 
         passou_fsr_total = passou_flex_x and passou_flex_y
-        if verifs['flexao_simples_reta']['x']['verificacao_aplicavel'] or verifs['flexao_simples_reta']['y']['verificacao_aplicavel']:
-            verifs['flexao_simples_reta']['passou'] = passou_fsr_total 
-            if erro_flex_x or erro_flex_y: verifs['flexao_simples_reta']['erro'] = f"X:{erro_flex_x or '-'} | Y:{erro_flex_y or '-'}"
+        if v_fsr_x['verificacao_aplicavel'] or v_fsr_y['verificacao_aplicavel']:
+            v_fsr['passou'] = passou_fsr_total 
+            if erro_flex_x or erro_flex_y: v_fsr['erro'] = f"X:{erro_flex_x or '-'} | Y:{erro_flex_y or '-'}"
         else: 
-             verifs['flexao_simples_reta']['verificacao_aplicavel'] = False
-             verifs['flexao_simples_reta']['passou'] = True 
+             v_fsr['verificacao_aplicavel'] = False
+             v_fsr['passou'] = True 
 
-    if verifs['flexao_obliqua']['verificacao_aplicavel']:
+    # Termos M/(f_md*W) comuns à flexão oblíqua, flexotração e flexocompressão com estabilidade
+    termo_Mx_fmd = _razao_segura(abs_Msdx, f_md * Wx); termo_My_fmd = _razao_segura(abs_Msdy, f_md * Wy)
+    sigma_Ncd = abs_Nsd_c0 / area if area > tol else inf
+
+    if executar('flexao_obliqua'):
         try:
-            p, ratio_num_fo = verificar_flexao_obliqua(esforcos_elu['Msdx'], esforcos_elu['Msdy'], geom['W_x'], geom['W_y'], calc_data['f_md'], k_M=k_M_usar)
-            termo_Mx_num = abs(esforcos_elu['Msdx']) / (calc_data['f_md'] * geom['W_x']) if abs(calc_data['f_md'] * geom['W_x']) > TOL else (0.0 if abs(esforcos_elu['Msdx']) < TOL else float('inf'))
-            termo_My_num = abs(esforcos_elu['Msdy']) / (calc_data['f_md'] * geom['W_y']) if abs(calc_data['f_md'] * geom['W_y']) > TOL else (0.0 if abs(esforcos_elu['Msdy']) < TOL else float('inf'))
-            ratio1_fo_num = termo_Mx_num + k_M_usar * termo_My_num if isinstance(termo_Mx_num, float) and isinstance(termo_My_num, float) and not (math.isinf(termo_Mx_num) or math.isinf(termo_My_num) or math.isnan(termo_Mx_num) or math.isnan(termo_My_num)) else float('inf')
-            ratio2_fo_num = k_M_usar * termo_Mx_num + termo_My_num if isinstance(termo_Mx_num, float) and isinstance(termo_My_num, float) and not (math.isinf(termo_Mx_num) or math.isinf(termo_My_num) or math.isnan(termo_Mx_num) or math.isnan(termo_My_num)) else float('inf')
+            p, ratio_num_fo = verificar_flexao_obliqua(Msdx, Msdy, Wx, Wy, f_md, k_M=k_M_usar)
+            termo_Mx_num = termo_Mx_fmd; termo_My_num = termo_My_fmd
+            ratio1_fo_num, ratio2_fo_num = _ratios_interacao(0.0, 0.0, termo_Mx_num, termo_My_num, k_M_usar)
 
             verifs['flexao_obliqua'].update({
-                'passou': p, 'ratio': ratio_num_fo, 'ratio_formatado': formatar_valor_numerico(ratio_num_fo),
-                'Msdx': esforcos_elu['Msdx'], 'Msdy': esforcos_elu['Msdy'], 'k_M_usado': k_M_usar,
-                'termo_Mx_formatado': formatar_valor_numerico(termo_Mx_num),
-                'termo_My_formatado': formatar_valor_numerico(termo_My_num),
-                'ratio1_fo_formatado': formatar_valor_numerico(ratio1_fo_num),
-                'ratio2_fo_formatado': formatar_valor_numerico(ratio2_fo_num)
+                'passou': p, 'ratio': ratio_num_fo, 'ratio_formatado': fmt(ratio_num_fo),
+                'Msdx': Msdx, 'Msdy': Msdy, 'k_M_usado': k_M_usar,
+                'termo_Mx_formatado': fmt(termo_Mx_num),
+                'termo_My_formatado': fmt(termo_My_num),
+                'ratio1_fo_formatado': fmt(ratio1_fo_num),
+                'ratio2_fo_formatado': fmt(ratio2_fo_num)
             })
         except Exception as e: verifs['flexao_obliqua'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'termo_Mx_formatado': "Erro", 'termo_My_formatado': "Erro", 'ratio1_fo_formatado': "Erro", 'ratio2_fo_formatado': "Erro"})
 
-    if verifs['flexotracao']['verificacao_aplicavel']:
+    if executar('flexotracao'):
         try:
-            p, ratio_num_ft = verificar_flexotracao(esforcos_elu['Nsd_t0'], esforcos_elu['Msdx'], esforcos_elu['Msdy'], geom['area'], geom['W_x'], geom['W_y'], calc_data['f_t0d'], calc_data['f_md'], k_M=k_M_usar)
-            termo_N_num = esforcos_elu['Nsd_t0'] / (calc_data['f_t0d'] * geom['area']) if abs(calc_data['f_t0d'] * geom['area']) > TOL else (0.0 if abs(esforcos_elu['Nsd_t0']) < TOL else float('inf'))
-            termo_Mx_num = abs(esforcos_elu['Msdx']) / (calc_data['f_md'] * geom['W_x']) if abs(calc_data['f_md'] * geom['W_x']) > TOL else (0.0 if abs(esforcos_elu['Msdx']) < TOL else float('inf'))
-            termo_My_num = abs(esforcos_elu['Msdy']) / (calc_data['f_md'] * geom['W_y']) if abs(calc_data['f_md'] * geom['W_y']) > TOL else (0.0 if abs(esforcos_elu['Msdy']) < TOL else float('inf'))
-            ratio1_ft_num = float('inf'); ratio2_ft_num = float('inf')
-            if not any(math.isinf(x) or math.isnan(x) for x in [termo_N_num, termo_Mx_num, termo_My_num]): 
-                 ratio1_ft_num = termo_N_num + termo_Mx_num + k_M_usar * termo_My_num
-                 ratio2_ft_num = termo_N_num + k_M_usar * termo_Mx_num + termo_My_num
+            p, ratio_num_ft = verificar_flexotracao(Nsd_t0, Msdx, Msdy, area, Wx, Wy, f_t0d, f_md, k_M=k_M_usar)
+            termo_N_num = _razao_segura(Nsd_t0, f_t0d * area)
+            termo_Mx_num = termo_Mx_fmd; termo_My_num = termo_My_fmd
+            ratio1_ft_num, ratio2_ft_num = _ratios_interacao(termo_N_num, termo_N_num, termo_Mx_num, termo_My_num, k_M_usar)
 
             verifs['flexotracao'].update({
-                'passou': p, 'ratio': ratio_num_ft, 'ratio_formatado': formatar_valor_numerico(ratio_num_ft),
-                'Nsd': esforcos_elu['Nsd_t0'], 'Msdx': esforcos_elu['Msdx'], 'Msdy': esforcos_elu['Msdy'], 'k_M_usado': k_M_usar,
-                'termo_N_formatado': formatar_valor_numerico(termo_N_num),
-                'termo_Mx_formatado': formatar_valor_numerico(termo_Mx_num),
-                'termo_My_formatado': formatar_valor_numerico(termo_My_num),
-                'ratio1_ft_formatado': formatar_valor_numerico(ratio1_ft_num),
-                'ratio2_ft_formatado': formatar_valor_numerico(ratio2_ft_num)
+                'passou': p, 'ratio': ratio_num_ft, 'ratio_formatado': fmt(ratio_num_ft),
+                'Nsd': Nsd_t0, 'Msdx': Msdx, 'Msdy': Msdy, 'k_M_usado': k_M_usar,
+                'termo_N_formatado': fmt(termo_N_num),
+                'termo_Mx_formatado': fmt(termo_Mx_num),
+                'termo_My_formatado': fmt(termo_My_num),
+                'ratio1_ft_formatado': fmt(ratio1_ft_num),
+                'ratio2_ft_formatado': fmt(ratio2_ft_num)
             })
         except Exception as e: verifs['flexotracao'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro", 'termo_N_formatado': "Erro", 'termo_Mx_formatado': "Erro", 'termo_My_formatado': "Erro", 'ratio1_ft_formatado': "Erro", 'ratio2_ft_formatado': "Erro"})
 
-    if verifs['flexocompressao']['verificacao_aplicavel']:
+    v_fc = verifs['flexocompressao']
+    if executar('flexocompressao'):
         passou_fc_res, passou_fc_est_final = True, True 
         erro_fc_res, erro_fc_est = None, None
-        verifs['flexocompressao']['resistencia'] = {'passou': False, 'ratio_formatado': 'N/A', 'termo_N_quad_formatado': 'N/A', 'termo_Mx_fmd_formatado': 'N/A', 'termo_My_fmd_formatado': 'N/A', 'ratio1_fc_res_formatado': 'N/A', 'ratio2_fc_res_formatado': 'N/A'}
-        verifs['flexocompressao']['estabilidade'] = {'passou': False, 'ratio_formatado': 'N/A', 'termo_N_kcx_formatado': 'N/A', 'termo_N_kcy_formatado': 'N/A', 'termo_Mx_fmd_formatado': 'N/A', 'termo_My_fmd_formatado': 'N/A', 'ratio1_fc_est_formatado': 'N/A', 'ratio2_fc_est_formatado': 'N/A'}
+        v_fc['resistencia'] = v_fc_res = {'passou': False, 'ratio_formatado': 'N/A', 'termo_N_quad_formatado': 'N/A', 'termo_Mx_fmd_formatado': 'N/A', 'termo_My_fmd_formatado': 'N/A', 'ratio1_fc_res_formatado': 'N/A', 'ratio2_fc_res_formatado': 'N/A'}
+        v_fc['estabilidade'] = v_fc_est = {'passou': False, 'ratio_formatado': 'N/A', 'termo_N_kcx_formatado': 'N/A', 'termo_N_kcy_formatado': 'N/A', 'termo_Mx_fmd_formatado': 'N/A', 'termo_My_fmd_formatado': 'N/A', 'ratio1_fc_est_formatado': 'N/A', 'ratio2_fc_est_formatado': 'N/A'}
         try: 
-            p_res, ratio_res_fc_num = verificar_flexocompressao_resistencia(esforcos_elu['Nsd_c0'], esforcos_elu['Msdx'], esforcos_elu['Msdy'], geom['area'], geom['W_x'], geom['W_y'], calc_data['f_c0d'], calc_data['f_md'], k_M=k_M_usar)
-            sigma_Ncd_val = abs(esforcos_elu['Nsd_c0']) / geom['area'] if geom['area'] > TOL else float('inf')
-            sigma_Msdx_val = abs(esforcos_elu['Msdx']) / geom['W_x'] if geom['W_x'] > TOL else float('inf')
-            sigma_Msdy_val = abs(esforcos_elu['Msdy']) / geom['W_y'] if geom['W_y'] > TOL else float('inf')
-            termo_N_quad_num = (sigma_Ncd_val / calc_data['f_c0d'])**2 if abs(calc_data['f_c0d']) > TOL else float('inf')
-            termo_Mx_fmd_num_res = sigma_Msdx_val / calc_data['f_md'] if abs(calc_data['f_md']) > TOL else float('inf')
-            termo_My_fmd_num_res = sigma_Msdy_val / calc_data['f_md'] if abs(calc_data['f_md']) > TOL else float('inf')
-            ratio1_fc_res_num, ratio2_fc_res_num = float('inf'), float('inf')
-            if not any(math.isinf(x) or math.isnan(x) for x in [termo_N_quad_num, termo_Mx_fmd_num_res, termo_My_fmd_num_res]):
-                ratio1_fc_res_num = termo_N_quad_num + termo_Mx_fmd_num_res + k_M_usar * termo_My_fmd_num_res
-                ratio2_fc_res_num = termo_N_quad_num + k_M_usar * termo_Mx_fmd_num_res + termo_My_fmd_num_res
-
-            verifs['flexocompressao']['resistencia'].update({'passou': p_res, 'ratio': ratio_res_fc_num, 'ratio_formatado': formatar_valor_numerico(ratio_res_fc_num), 'Nsd': esforcos_elu['Nsd_c0'], 'Msdx': esforcos_elu['Msdx'], 'Msdy': esforcos_elu['Msdy'], 'k_M_usado': k_M_usar, 'termo_N_quad_formatado': formatar_valor_numerico(termo_N_quad_num), 'termo_Mx_fmd_formatado': formatar_valor_numerico(termo_Mx_fmd_num_res), 'termo_My_fmd_formatado': formatar_valor_numerico(termo_My_fmd_num_res), 'ratio1_fc_res_formatado': formatar_valor_numerico(ratio1_fc_res_num), 'ratio2_fc_res_formatado': formatar_valor_numerico(ratio2_fc_res_num)})
+            p_res, ratio_res_fc_num = verificar_flexocompressao_resistencia(Nsd_c0, Msdx, Msdy, area, Wx, Wy, f_c0d, f_md, k_M=k_M_usar)
+            sigma_Msdx_val = abs_Msdx / Wx if Wx > tol else inf
+            sigma_Msdy_val = abs_Msdy / Wy if Wy > tol else inf
+            termo_N_quad_num = _razao_ou_inf(sigma_Ncd, f_c0d)**2
+            termo_Mx_fmd_num_res = _razao_ou_inf(sigma_Msdx_val, f_md)
+            termo_My_fmd_num_res = _razao_ou_inf(sigma_Msdy_val, f_md)
+            ratio1_fc_res_num, ratio2_fc_res_num = _ratios_interacao(termo_N_quad_num, termo_N_quad_num, termo_Mx_fmd_num_res, termo_My_fmd_num_res, k_M_usar)
+
+            v_fc_res.update({'passou': p_res, 'ratio': ratio_res_fc_num, 'ratio_formatado': fmt(ratio_res_fc_num), 'Nsd': Nsd_c0, 'Msdx': Msdx, 'Msdy': Msdy, 'k_M_usado': k_M_usar, 'termo_N_quad_formatado': fmt(termo_N_quad_num), 'termo_Mx_fmd_formatado': fmt(termo_Mx_fmd_num_res), 'termo_My_fmd_formatado': fmt(termo_My_fmd_num_res), 'ratio1_fc_res_formatado': fmt(ratio1_fc_res_num), 'ratio2_fc_res_formatado': fmt(ratio2_fc_res_num)})
             if not p_res: passou_fc_res = False
-        except Exception as e: erro_fc_res = str(e); passou_fc_res = False; verifs['flexocompressao']['resistencia'].update({'passou': False, 'erro': erro_fc_res, 'ratio_formatado': "Erro"})
+        except Exception as e: erro_fc_res = str(e); passou_fc_res = False; v_fc_res.update({'passou': False, 'erro': erro_fc_res, 'ratio_formatado': "Erro"})
 
         try: 
-            res_fc_est = verificar_flexocompressao_com_estabilidade(esforcos_elu['Nsd_c0'], esforcos_elu['Msdx'], esforcos_elu['Msdy'], geom['area'], geom['W_x'], geom['W_y'], calc_data['f_c0k'], calc_data['f_c0d'], calc_data['f_md'], calc_data['E_005'], resultados['comprimento_mm'], resultados['Ke_x'], resultados['Ke_y'], props_geom=geom, beta_c=calc_data['beta_c'], k_M=k_M_usar)
-            sigma_Ncd_val_est = abs(esforcos_elu['Nsd_c0']) / geom['area'] if geom['area'] > TOL else float('inf')
+            res_fc_est = verificar_flexocompressao_com_estabilidade(Nsd_c0, Msdx, Msdy, area, Wx, Wy, f_c0k, f_c0d, f_md, E_005, comprimento_mm, Ke_x, Ke_y, props_geom=None, beta_c=beta_c, k_M=k_M_usar, i_x=i_x, i_y=i_y)
             kc_x_val, kc_y_val = res_fc_est[6], res_fc_est[7] 
-            termo_N_kcx_num = sigma_Ncd_val_est / (kc_x_val * calc_data['f_c0d']) if abs(kc_x_val * calc_data['f_c0d']) > TOL else float('inf')
-            termo_N_kcy_num = sigma_Ncd_val_est / (kc_y_val * calc_data['f_c0d']) if abs(kc_y_val * calc_data['f_c0d']) > TOL else float('inf')
-            termo_Mx_fmd_num_est = abs(esforcos_elu['Msdx']) / (calc_data['f_md'] * geom['W_x']) if abs(calc_data['f_md'] * geom['W_x']) > TOL else float('inf')
-            termo_My_fmd_num_est = abs(esforcos_elu['Msdy']) / (calc_data['f_md'] * geom['W_y']) if abs(calc_data['f_md'] * geom['W_y']) > TOL else float('inf')
-            ratio1_fc_est_num, ratio2_fc_est_num = float('inf'), float('inf')
-            if not any(math.isinf(x) or math.isnan(x) for x in [termo_N_kcx_num, termo_Mx_fmd_num_est, termo_My_fmd_num_est]):
-                 ratio1_fc_est_num = termo_N_kcx_num + termo_Mx_fmd_num_est + k_M_usar * termo_My_fmd_num_est
-            if not any(math.isinf(x) or math.isnan(x) for x in [termo_N_kcy_num, termo_Mx_fmd_num_est, termo_My_fmd_num_est]):
-                 ratio2_fc_est_num = termo_N_kcy_num + k_M_usar * termo_Mx_fmd_num_est + termo_My_fmd_num_est
-
-            verifs['flexocompressao']['estabilidade'].update({'passou': res_fc_est[0], 'ratio': res_fc_est[1], 'ratio_formatado': formatar_valor_numerico(res_fc_est[1]), 'lambda_x': res_fc_est[2], 'lambda_y': res_fc_est[3], 'lambda_rel_x': res_fc_est[4], 'lambda_rel_y': res_fc_est[5], 'kc_x': kc_x_val, 'kc_y': kc_y_val, 'k_M_usado': k_M_usar, 'lambda_max': res_fc_est[8], 'esbeltez_ok': res_fc_est[9], 'passou_ratio_apenas': res_fc_est[10], 'termo_N_kcx_formatado': formatar_valor_numerico(termo_N_kcx_num), 'termo_N_kcy_formatado': formatar_valor_numerico(termo_N_kcy_num), 'termo_Mx_fmd_formatado': formatar_valor_numerico(termo_Mx_fmd_num_est), 'termo_My_fmd_formatado': formatar_valor_numerico(termo_My_fmd_num_est), 'ratio1_fc_est_formatado': formatar_valor_numerico(ratio1_fc_est_num), 'ratio2_fc_est_formatado': formatar_valor_numerico(ratio2_fc_est_num)})
+            termo_N_kcx_num, termo_N_kcy_num, termo_Mx_fmd_num_est, termo_My_fmd_num_est, ratio1_fc_est_num, ratio2_fc_est_num = _ratios_fc(sigma_Ncd, _razao_ou_inf(abs_Msdx, f_md * Wx), _razao_ou_inf(abs_Msdy, f_md * Wy), f_c0d, kc_x_val, kc_y_val, k_M_usar)
+
+            v_fc_est.update({'passou': res_fc_est[0], 'ratio': res_fc_est[1], 'ratio_formatado': fmt(res_fc_est[1]), 'lambda_x': res_fc_est[2], 'lambda_y': res_fc_est[3], 'lambda_rel_x': res_fc_est[4], 'lambda_rel_y': res_fc_est[5], 'kc_x': kc_x_val, 'kc_y': kc_y_val, 'k_M_usado': k_M_usar, 'lambda_max': res_fc_est[8], 'esbeltez_ok': res_fc_est[9], 'passou_ratio_apenas': res_fc_est[10], 'termo_N_kcx_formatado': fmt(termo_N_kcx_num), 'termo_N_kcy_formatado': fmt(termo_N_kcy_num), 'termo_Mx_fmd_formatado': fmt(termo_Mx_fmd_num_est), 'termo_My_fmd_formatado': fmt(termo_My_fmd_num_est), 'ratio1_fc_est_formatado': fmt(ratio1_fc_est_num), 'ratio2_fc_est_formatado': fmt(ratio2_fc_est_num)})
             if not res_fc_est[0]: passou_fc_est_final = False
-        except Exception as e: erro_fc_est = str(e); passou_fc_est_final = False; verifs['flexocompressao']['estabilidade'].update({'passou': False, 'erro': erro_fc_est, 'ratio_formatado': "Erro"})
+        except Exception as e: erro_fc_est = str(e); passou_fc_est_final = False; v_fc_est.update({'passou': False, 'erro': erro_fc_est, 'ratio_formatado': "Erro"})
 
         passou_fc_total = passou_fc_res and passou_fc_est_final
-        verifs['flexocompressao']['passou'] = passou_fc_total 
-        if erro_fc_res or erro_fc_est: verifs['flexocompressao']['erro'] = f"Res:{erro_fc_res or '-'} | Est:{erro_fc_est or '-'}"
+        v_fc['passou'] = passou_fc_total 
+        if erro_fc_res or erro_fc_est: v_fc['erro'] = f"Res:{erro_fc_res or '-'} | Est:{erro_fc_est or '-'}"
 
-    if verifs['cisalhamento']['verificacao_aplicavel']:
+    if executar('cisalhamento'):
         try:
-            p, vsd, vrd, ratio_num = verificar_cisalhamento(esforcos_elu['Vsd'], geom['area'], calc_data['f_vd'])
-            verifs['cisalhamento'].update({'passou': p, 'Vsd': vsd, 'VRd': vrd, 'Vsd_formatado': f"{vsd:.2f}", 'VRd_formatado': f"{vrd:.2f}", 'ratio': ratio_num, 'ratio_formatado': formatar_valor_numerico(ratio_num)})
+            p, vsd, vrd, ratio_num = verificar_cisalhamento(esforcos_elu['Vsd'], area, calc_data['f_vd'])
+            v = verifs['cisalhamento']; v['passou'] = p; v['Vsd'] = vsd; v['VRd'] = vrd; v['Vsd_formatado'] = f2(vsd); v['VRd_formatado'] = f2(vrd); v['ratio'] = ratio_num; v['ratio_formatado'] = fmt(ratio_num)
         except Exception as e: verifs['cisalhamento'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"})
 
-    if verifs['estabilidade_lateral']['verificacao_aplicavel']:
+    if executar('estabilidade_lateral'):
         try:
-            resultados_fl = verificar_estabilidade_lateral_viga(resultados['largura_mm'], resultados['altura_mm'], resultados['L1_mm'], calc_data['E_0med'], calc_data['f_md'], calc_data['k_mod'], esforcos_elu['Msdx'], geom['W_x'])
-            ratio_fl_num = float('nan') 
+            resultados_fl = verificar_estabilidade_lateral_viga(resultados['largura_mm'], resultados['altura_mm'], resultados['L1_mm'], calc_data['E_0med'], f_md, calc_data['k_mod'], Msdx, Wx)
+            ratio_fl_num = nan 
             sigma_cd_atuante_num = resultados_fl.get('sigma_cd_atuante')
             sigma_cd_max_adm_num = resultados_fl.get('sigma_cd_max_adm')
-            resultados_fl['sigma_cd_atuante_formatado'] = formatar_valor_numerico(sigma_cd_atuante_num) if isinstance(sigma_cd_atuante_num, (int,float)) else "N/A"
-            resultados_fl['sigma_cd_max_adm_formatado'] = formatar_valor_numerico(sigma_cd_max_adm_num) if isinstance(sigma_cd_max_adm_num, (int,float)) else "N/A"
+            resultados_fl['sigma_cd_atuante_formatado'] = fmt(sigma_cd_atuante_num) if isinstance(sigma_cd_atuante_num, (int,float)) else "N/A"
+            resultados_fl['sigma_cd_max_adm_formatado'] = fmt(sigma_cd_max_adm_num) if isinstance(sigma_cd_max_adm_num, (int,float)) else "N/A"
 
-            if not resultados_fl.get('dispensado') and isinstance(sigma_cd_atuante_num, (int,float)) and isinstance(sigma_cd_max_adm_num, (int,float)) and abs(sigma_cd_max_adm_num) > TOL:
+            if not resultados_fl.get('dispensado') and isinstance(sigma_cd_atuante_num, (int,float)) and isinstance(sigma_cd_max_adm_num, (int,float)) and abs(sigma_cd_max_adm_num) > tol:
                 ratio_fl_num = sigma_cd_atuante_num / sigma_cd_max_adm_num
             elif not resultados_fl.get('dispensado'): 
-                ratio_fl_num = float('inf') if isinstance(sigma_cd_atuante_num, (int,float)) and abs(sigma_cd_atuante_num) > TOL else (0.0 if isinstance(sigma_cd_atuante_num, (int,float)) else float('nan'))
-            resultados_fl['ratio_formatado'] = formatar_valor_numerico(ratio_fl_num) if not resultados_fl.get('dispensado') else "Dispensado"
+                ratio_fl_num = inf if isinstance(sigma_cd_atuante_num, (int,float)) and abs(sigma_cd_atuante_num) > tol else (0.0 if isinstance(sigma_cd_atuante_num, (int,float)) else nan)
+            resultados_fl['ratio_formatado'] = fmt(ratio_fl_num) if not resultados_fl.get('dispensado') else "Dispensado"
 
             verifs['estabilidade_lateral'].update(resultados_fl)
             if resultados_fl.get('erro'):
@@ -443,9 +769,11 @@ def realizar_calculo_completo(dados_validados):
         except Exception as e: verifs['estabilidade_lateral'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"})
 
     # Bloco de verificações ELS (Flechas)
+    v_qp = verifs['flechas_qp']; v_vento = verifs['flechas_vento']
     passou_els_geral_para_calculo_interno = True # Nova flag para status interno do ELS
-    if verificacao_flechas_selecionada:
-        l_mm = resultados['comprimento_mm']
+    # A aplicabilidade das flechas já exige a seleção de 'flechas_els'; sem carga ELS não há por que buscar phi
+    if v_qp['verificacao_aplicavel'] or v_vento['verificacao_aplicavel']:
+        l_mm = comprimento_mm
         e0_para_flecha = calc_data.get('E_0med')
         phi = calc_data.get('phi') 
 
@@ -454,41 +782,33 @@ def realizar_calculo_completo(dados_validados):
                 phi = obter_coeficiente_fluencia(resultados['classe_umidade'], tipo_mad_kmod) 
                 calc_data['phi'] = phi 
             except Exception as e:
-                 if verifs['flechas_qp']['verificacao_aplicavel']: verifs['flechas_qp'].update({'passou': False, 'erro': f"Erro ao obter phi: {e}", 'ratio_formatado': "Erro"})
-                 if verifs['flechas_vento']['verificacao_aplicavel']: verifs['flechas_vento'].update({'passou': False, 'erro': f"Erro ao obter phi: {e}", 'ratio_formatado': "Erro"})
+                 if v_qp['verificacao_aplicavel']: v_qp.update({'passou': False, 'erro': f"Erro ao obter phi: {e}", 'ratio_formatado': "Erro"})
+                 if v_vento['verificacao_aplicavel']: v_vento.update({'passou': False, 'erro': f"Erro ao obter phi: {e}", 'ratio_formatado': "Erro"})
                  phi = None 
                  passou_els_geral_para_calculo_interno = False
 
-        if verifs['flechas_qp']['verificacao_aplicavel'] and phi is not None:
+        if v_qp['verificacao_aplicavel'] and phi is not None:
             try:
-                delta_inst_qp_x = calcular_flecha_instantanea_biapoiada_distribuida(q=esforcos_els['q_qp_x'], L=l_mm, E0_med=e0_para_flecha, I=geom['I_y'])
-                delta_inst_qp_y = calcular_flecha_instantanea_biapoiada_distribuida(q=esforcos_els['q_qp_y'], L=l_mm, E0_med=e0_para_flecha, I=geom['I_x'])
+                delta_inst_qp_x, delta_inst_qp_y = calcular_flechas_instantaneas_biapoiada_distribuida(esforcos_els['q_qp_x'], esforcos_els['q_qp_y'], l_mm, e0_para_flecha, geom['I_x'], geom['I_y'])
                 passou_qp, d_x_fin, d_y_fin, d_res, d_lim = verificar_flecha_final(delta_inst_qp_x, delta_inst_qp_y, phi, l_mm, tipo_viga='biapoiada')
-                ratio_qp_str = "N/A"
-                if abs(d_lim) > TOL: ratio_val = d_res / d_lim; ratio_qp_str = formatar_valor_numerico(ratio_val)
-                elif abs(d_res) <= TOL: ratio_qp_str = "0.000" 
-                else: ratio_qp_str = "Infinito" 
-                verifs['flechas_qp'].update({'passou': passou_qp, 'delta_inst_x': delta_inst_qp_x, 'delta_inst_y': delta_inst_qp_y, 'phi': phi, 'delta_x_final': d_x_fin, 'delta_y_final': d_y_fin, 'delta_resultante': d_res, 'delta_limite': d_lim, 'ratio_formatado': ratio_qp_str})
+                ratio_qp_str = fmt(_razao_segura(d_res, d_lim))
+                v_qp.update({'passou': passou_qp, 'delta_inst_x': delta_inst_qp_x, 'delta_inst_y': delta_inst_qp_y, 'phi': phi, 'delta_x_final': d_x_fin, 'delta_y_final': d_y_fin, 'delta_resultante': d_res, 'delta_limite': d_lim, 'ratio_formatado': ratio_qp_str})
                 if not passou_qp: passou_els_geral_para_calculo_interno = False
-            except Exception as e: verifs['flechas_qp'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"}); passou_els_geral_para_calculo_interno = False
-        elif phi is None and verifs['flechas_qp']['verificacao_aplicavel']: 
-             verifs['flechas_qp'].update({'passou': False, 'erro': "Coeficiente de fluência (phi) não pôde ser determinado.", 'ratio_formatado': "Erro"})
+            except Exception as e: v_qp.update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"}); passou_els_geral_para_calculo_interno = False
+        elif phi is None and v_qp['verificacao_aplicavel']: 
+             v_qp.update({'passou': False, 'erro': "Coeficiente de fluência (phi) não pôde ser determinado.", 'ratio_formatado': "Erro"})
              passou_els_geral_para_calculo_interno = False
 
-        if verifs['flechas_vento']['verificacao_aplicavel'] and phi is not None: 
+        if v_vento['verificacao_aplicavel'] and phi is not None: 
             try:
-                delta_inst_vento_x = calcular_flecha_instantanea_biapoiada_distribuida(q=esforcos_els['q_vento_x'], L=l_mm, E0_med=e0_para_flecha, I=geom['I_y'])
-                delta_inst_vento_y = calcular_flecha_instantanea_biapoiada_distribuida(q=esforcos_els['q_vento_y'], L=l_mm, E0_med=e0_para_flecha, I=geom['I_x'])
+                delta_inst_vento_x, delta_inst_vento_y = calcular_flechas_instantaneas_biapoiada_distribuida(esforcos_els['q_vento_x'], esforcos_els['q_vento_y'], l_mm, e0_para_flecha, geom['I_x'], geom['I_y'])
                 passou_vento, d_x_fin_v, d_y_fin_v, d_res_v, d_lim_v = verificar_flecha_final(delta_inst_vento_x, delta_inst_vento_y, phi, l_mm, tipo_viga='biapoiada')
-                ratio_vento_str = "N/A"
-                if abs(d_lim_v) > TOL: ratio_val_v = abs(d_res_v) / d_lim_v; ratio_vento_str = formatar_valor_numerico(ratio_val_v) 
-                elif abs(d_res_v) <= TOL: ratio_vento_str = "0.000"
-                else: ratio_vento_str = "Infinito"
-                verifs['flechas_vento'].update({'passou': passou_vento, 'delta_inst_x': delta_inst_vento_x, 'delta_inst_y': delta_inst_vento_y, 'phi': phi, 'delta_x_final': d_x_fin_v, 'delta_y_final': d_y_fin_v, 'delta_resultante': d_res_v, 'delta_limite': d_lim_v, 'ratio_formatado': ratio_vento_str})
+                ratio_vento_str = fmt(_razao_segura(abs(d_res_v), d_lim_v))
+                v_vento.update({'passou': passou_vento, 'delta_inst_x': delta_inst_vento_x, 'delta_inst_y': delta_inst_vento_y, 'phi': phi, 'delta_x_final': d_x_fin_v, 'delta_y_final': d_y_fin_v, 'delta_resultante': d_res_v, 'delta_limite': d_lim_v, 'ratio_formatado': ratio_vento_str})
                 if not passou_vento: passou_els_geral_para_calculo_interno = False
-            except Exception as e: verifs['flechas_vento'].update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"}); passou_els_geral_para_calculo_interno = False
-        elif phi is None and verifs['flechas_vento']['verificacao_aplicavel']:
-             verifs['flechas_vento'].update({'passou': False, 'erro': "Coeficiente de fluência (phi) não pôde ser determinado.", 'ratio_formatado': "Erro"})
+            except Exception as e: v_vento.update({'passou': False, 'erro': str(e), 'ratio_formatado': "Erro"}); passou_els_geral_para_calculo_interno = False
+        elif phi is None and v_vento['verificacao_aplicavel']:
+             v_vento.update({'passou': False, 'erro': "Coeficiente de fluência (phi) não pôde ser determinado.", 'ratio_formatado': "Erro"})
              passou_els_geral_para_calculo_interno = False
 
 
@@ -497,109 +817,149 @@ def realizar_calculo_completo(dados_validados):
     verificacoes_selecionadas_pelo_usuario = resultados.get('verificacoes_selecionadas', [])
     verificacoes_processadas = resultados['verificacoes']
 
-    print(f"DEBUG: Recalculando geral_ok. Selecionadas pelo usuário: {verificacoes_selecionadas_pelo_usuario}")
-
-    for chave_form_selecionada in verificacoes_selecionadas_pelo_usuario:
-        verificacao_com_falha_ou_erro_para_item_selecionado = False
-
-        if chave_form_selecionada == 'dimensoes':
-            v = verificacoes_processadas.get('dimensoes', {})
-            if v.get('verificacao_aplicavel') and (v.get('erro') or v.get('passou') is False):
-                verificacao_com_falha_ou_erro_para_item_selecionado = True
-        
-        elif chave_form_selecionada == 'tracao_simples':
-            v = verificacoes_processadas.get('tracao_simples', {})
-            if v.get('verificacao_aplicavel') and (v.get('erro') or v.get('passou') is False):
-                # Considera falha se não for um caso combinado que será coberto por um "pai" também selecionado.
-                # Se 'flexotracao' não estiver selecionada, a falha de 'tracao_simples' conta.
-                if not v.get('is_combined_case') or 'flexotracao' not in verificacoes_selecionadas_pelo_usuario:
-                    verificacao_com_falha_ou_erro_para_item_selecionado = True
-        
-        elif chave_form_selecionada == 'compressao_simples_resistencia': 
-            v_res = verificacoes_processadas.get('compressao_simples_resistencia', {})
-            v_est = verificacoes_processadas.get('compressao_estabilidade', {})
-            if v_res.get('verificacao_aplicavel'):
-                if v_res.get('erro') or v_est.get('erro'):
-                    verificacao_com_falha_ou_erro_para_item_selecionado = True
-                elif v_res.get('passou_geral_compressao_pura') is False:
-                    if not v_res.get('is_combined_case') or 'flexocompressao' not in verificacoes_selecionadas_pelo_usuario:
-                        verificacao_com_falha_ou_erro_para_item_selecionado = True
-                        
-        elif chave_form_selecionada == 'flexao_simples_reta':
-            v = verificacoes_processadas.get('flexao_simples_reta', {})
-            if v.get('verificacao_aplicavel') and (v.get('erro') or v.get('passou') is False):
-                is_combined = v.get('is_combined_case', False)
-                # Verifica se algum dos "pais" que tornariam este 'is_combined' foi selecionado
-                parent_selected = False
-                if 'flexao_obliqua' in verificacoes_selecionadas_pelo_usuario and resultados['verificacoes'].get('flexao_obliqua',{}).get('verificacao_aplicavel'):
-                    parent_selected = True
-                if not parent_selected and 'flexotracao' in verificacoes_selecionadas_pelo_usuario and resultados['verificacoes'].get('flexotracao',{}).get('verificacao_aplicavel'):
-                    parent_selected = True
-                if not parent_selected and 'flexocompressao' in verificacoes_selecionadas_pelo_usuario and resultados['verificacoes'].get('flexocompressao',{}).get('verificacao_aplicavel'):
-                    parent_selected = True
-                
-                if not is_combined or not parent_selected: # Se não é combinado, ou se é mas o pai não foi selecionado
-                     verificacao_com_falha_ou_erro_para_item_selecionado = True
-
-        elif chave_form_selecionada == 'flechas_els': 
-            v_qp = verificacoes_processadas.get('flechas_qp', {})
-            v_vento = verificacoes_processadas.get('flechas_vento', {})
-            aplic_qp = v_qp.get('verificacao_aplicavel', False)
-            aplic_vento = v_vento.get('verificacao_aplicavel', False)
-            if aplic_qp or aplic_vento : 
-                if v_qp.get('erro') or v_vento.get('erro'):
-                    verificacao_com_falha_ou_erro_para_item_selecionado = True
-                else:
-                    passou_qp_final = (not aplic_qp) or (v_qp.get('passou') is True)
-                    passou_vento_final = (not aplic_vento) or (v_vento.get('passou') is True)
-                    if not (passou_qp_final and passou_vento_final):
-                        verificacao_com_falha_ou_erro_para_item_selecionado = True
-        
-        elif chave_form_selecionada == 'estabilidade_lateral':
-            v = verificacoes_processadas.get('estabilidade_lateral',{})
-            if v.get('verificacao_aplicavel'):
-                if v.get('erro'):
-                    verificacao_com_falha_ou_erro_para_item_selecionado = True
-                elif not v.get('dispensado', False) and v.get('passou') is False:
-                    verificacao_com_falha_ou_erro_para_item_selecionado = True
-        
-        elif chave_form_selecionada in ['tracao_perpendicular', 'compressao_perpendicular', 
-                                       'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento']:
-            v = verificacoes_processadas.get(chave_form_selecionada, {})
-            if v.get('verificacao_aplicavel') and (v.get('erro') or v.get('passou') is False):
-                verificacao_com_falha_ou_erro_para_item_selecionado = True
-
-        if verificacao_com_falha_ou_erro_para_item_selecionado:
-            geral_ok_final = False
-            print(f"DEBUG: Verificação selecionada '{chave_form_selecionada}' causou reprovação no geral_ok_final.")
-            # Não há 'break' aqui, pois se qualquer uma das SELECIONADAS falhar, o status final é False.
-            # O debug log ajudará a identificar todas as selecionadas que falharam.
+    _log.debug("Recalculando geral_ok. Selecionadas pelo usuário: %s", verificacoes_selecionadas_pelo_usuario)
+
+    sel = set(verificacoes_selecionadas_pelo_usuario)
+    estado = _estado_verificacoes(verificacoes_processadas)
+    def reprovou(chave):
+        regra = _REGRAS_GERAL_OK.get(chave)
+        return regra is not None and regra(verificacoes_processadas, estado, sel)
+
+    if _log.isEnabledFor(logging.DEBUG):
+        # Com DEBUG ativo, percorre todas as selecionadas para registrar cada uma que reprovou
+        for chave_form_selecionada in verificacoes_selecionadas_pelo_usuario:
+            if reprovou(chave_form_selecionada):
+                geral_ok_final = False
+                _log.debug("Verificação selecionada '%s' causou reprovação no geral_ok_final.", chave_form_selecionada)
+    else:
+        # Basta uma selecionada reprovada: any() interrompe na primeira falha
+        geral_ok_final = not any(map(reprovou, sel))
 
     resultados['geral_ok'] = geral_ok_final
-    print(f"DEBUG: --- Finalizando realizar_calculo_completo - geral_ok FINAL (baseado nas seleções): {geral_ok_final} ---")
+    _log.debug("--- Finalizando realizar_calculo_completo - geral_ok FINAL (baseado nas seleções): %s ---", geral_ok_final)
     return resultados
 
+# --- Memorização do cálculo completo ---
+def _chave_calculo(dados_validados):
+    """
+    Congela `dados_validados` numa tupla hashable, ordenada pelas chaves para não depender da
+    ordem de montagem do dict (listas viram tuplas; -0.0 vira 0.0, já que ambos têm o mesmo hash
+    e seriam a mesma chave).
+    """
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else (v + 0.0 if type(v) is float else v)) for k, v in dados_validados.items()))
+
+@lru_cache(maxsize=512)
+def _calculo_memorizado(chave):
+    """Executa `realizar_calculo_completo` a partir da chave congelada; o resultado fica em cache."""
+    return realizar_calculo_completo({k: list(v) if type(v) is tuple else v for k, v in chave})
+
+def calcular_com_cache(dados_validados):
+    """
+    Versão memorizada de `realizar_calculo_completo` para as rotas. Reenvios do mesmo formulário
+    (ex.: link do relatório detalhado) reaproveitam o resultado. Em modo debug o cache é ignorado,
+    para que os logs de depuração do cálculo apareçam a cada requisição.
+
+    Returns:
+        dict: Cópia rasa do resultado em cache. As rotas só acrescentam chaves de primeiro nível
+              ('mostrar_verificacoes', 'inputs'); os dicts internos são compartilhados e não devem
+              ser alterados.
+    """
+    if app.debug: return realizar_calculo_completo(dict(dados_validados))
+    return dict(_calculo_memorizado(_chave_calculo(dados_validados)))
+
 # --- Rotas Flask ---
+# Templates dos relatórios e da página de erro compilados uma única vez na importação; render_template
+# aceita o objeto Template e dispensa a busca por nome (editar os .html exige reiniciar).
+# Fora do modo debug, o bytecode compilado fica em disco (diretório temporário do usuário) e é
+# reaproveitado quando os workers reiniciam, sem refazer o parse dos templates.
+if not MODO_DEBUG: app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+_TPL_RELATORIO = app.jinja_env.get_template('relatorio.html')
+_TPL_RELATORIO_DETALHADO = app.jinja_env.get_template('relatorio_detalhado.html')
+_TPL_ERRO = app.jinja_env.get_template('erro.html')
+
+# O relatório detalhado é função pura da query string: o ETag é o hash dela, salgado por processo
+# (gerado antes do fork sob --preload) para que um novo deploy não reaproveite páginas antigas.
+_ETAG_SAL = os.urandom(8)
+
+def _etag_relatorio(query_string):
+    """Calcula o ETag do relatório detalhado para a query string bruta."""
+    return hashlib.blake2b(query_string, digest_size=16, key=_ETAG_SAL).hexdigest()
+
+def _inputs_para_erro(inputs_processados, dados_requisicao):
+    """
+    Monta os inputs repassados à página de erro: os já processados pela rota, se houver,
+    ou uma cópia dos dados brutos da requisição (form ou query string).
+    """
+    if not inputs_processados:
+        inputs_processados = dados_requisicao.to_dict()
+        inputs_processados['verificacoes_selecionadas'] = dados_requisicao.getlist('verificacoes_selecionadas')
+    elif 'verificacoes_selecionadas' not in inputs_processados:
+        inputs_processados['verificacoes_selecionadas'] = dados_requisicao.getlist('verificacoes_selecionadas')
+    return inputs_processados
+
+# Erros atribuídos a dados de entrada inválidos (HTTP 400); os demais são falhas do servidor (HTTP 500)
+_ERROS_ENTRADA = (ValueError, KeyError, NameError, ImportError, ZeroDivisionError)
+
+def _calcular_relatorio(rota, inputs, verificacoes_selecionadas, esquema, rotulo_classe_madeira):
+    """
+    Etapa comum às rotas de relatório: valida as entradas, executa o cálculo (memorizado) e
+    anexa ao resultado o mapa de exibição e os inputs usados nos links.
+
+    Args:
+        rota (str): Nome da rota, usado nos logs.
+        inputs (dict): Entradas brutas da requisição (já com 'verificacoes_selecionadas').
+        verificacoes_selecionadas (list): Verificações marcadas pelo usuário.
+        esquema (tuple): Esquema de validação da rota (_ESQUEMA_CALCULAR ou _ESQUEMA_RELATORIO).
+        rotulo_classe_madeira (str): Rótulo do campo de classe nas mensagens de erro.
+
+    Returns:
+        dict: Resultados prontos para o template.
+    """
+    mostrar_verificacoes = _mostrar_verificacoes(verificacoes_selecionadas)
+    _log.debug("%s - mostrar_verificacoes: %s", rota, mostrar_verificacoes)
+
+    dados_validados = dict(validar_entradas(_entradas_brutas(inputs), esquema, rotulo_classe_madeira))
+    dados_validados['verificacoes_selecionadas'] = verificacoes_selecionadas
+
+    resultados_calculados = calcular_com_cache(dados_validados)
+    resultados_calculados['mostrar_verificacoes'] = mostrar_verificacoes
+    resultados_calculados['inputs'] = inputs
+    return resultados_calculados
+
+def _resposta_erro(e, rota, prefixo_msg, inputs_processados, dados_requisicao):
+    """
+    Resposta das rotas de relatório para uma exceção; deve ser chamada dentro do bloco `except`.
+    Erros de entrada geram 400 (pilha só em DEBUG); os inesperados, 500 com a pilha no log.
+    """
+    current_inputs_for_error = _inputs_para_erro(inputs_processados, dados_requisicao)
+    if isinstance(e, _ERROS_ENTRADA):
+        msg_erro = f"{prefixo_msg}: {str(e)}"
+        _log.warning("Erro %s: %s", rota, msg_erro, exc_info=_log.isEnabledFor(logging.DEBUG))
+        status = 400
+    else:
+        _log.exception("ERRO INESPERADO (%s)", rota)
+        msg_erro = f"Ocorreu um erro inesperado no servidor: {type(e).__name__}"
+        status = 500
+    return render_template(_TPL_ERRO, mensagem=msg_erro, inputs=current_inputs_for_error), status
+
 def log_message_for_template(message):
-    """Helper para permitir `print` dentro do template via `log_message(...)`."""
-    print(message)
+    """Helper para permitir log de depuração dentro do template via `log_message(...)`."""
+    _log.debug("%s", message)
     return '' # Retorna string vazia para não renderizar nada no HTML
 
+# Constantes e helpers usados pelos templates, registrados uma única vez como globais do Jinja
+# (os templates pré-carregados enxergam as globais do ambiente) em vez de repassados a cada renderização
+app.jinja_env.globals.update(TOL=TOL, abs=abs, max=max, GAMMA_C=GAMMA_C, GAMMA_T=GAMMA_T, GAMMA_M=GAMMA_M, GAMMA_V=GAMMA_V, log_message=log_message_for_template)
+
 @app.route('/')
 def inicio():
     """Renderiza a página inicial da aplicação."""
-    return render_template('inicio.html', log_message=log_message_for_template)
+    return render_template('inicio.html')
 
 @app.route('/novo_dimensionamento')
 def formulario():
     """Renderiza o formulário para entrada de dados."""
-    global tabelas_madeira 
-    try:
-        from calculos_madeira import tabelas_madeira as tabelas_importadas
-        tabelas_a_passar = tabelas_importadas
-    except Exception:
-        tabelas_a_passar = tabelas_madeira 
-    return render_template('formulario.html', tabelas_madeira=tabelas_a_passar, log_message=log_message_for_template)
+    return render_template('formulario.html', tabelas_madeira=tabelas_madeira)
 
 @app.route('/calcular', methods=['POST'])
 def calcular_e_verificar():
@@ -607,81 +967,24 @@ def calcular_e_verificar():
     Recebe os dados do formulário, valida, executa os cálculos e
     renderiza o relatório resumido.
     """
-    print("DEBUG: --- Rota /calcular CHAMADA ---")
+    _log.debug("--- Rota /calcular CHAMADA ---")
     input_data_storage_for_link = {} 
     verificacoes_selecionadas_lista = []
     try:
-        if not MODULO_CALCULOS_OK: raise ImportError("Módulo de cálculos não carregado.")
         form_data = request.form 
         verificacoes_selecionadas_lista = form_data.getlist('verificacoes_selecionadas') 
-        print(f"DEBUG: /calcular - verificacoes_selecionadas_lista DO FORM: {verificacoes_selecionadas_lista}")
-
-        input_data_storage_for_link = {key: form_data.getlist(key) if key == 'verificacoes_selecionadas' else form_data.get(key) for key in form_data}
-        print(f"DEBUG: /calcular - input_data_storage_for_link P/ URL: {input_data_storage_for_link}")
-
-        chaves_sel = ['dimensoes', 'tracao_simples', 'tracao_perpendicular', 'compressao_simples_resistencia', 'compressao_perpendicular', 'flexao_simples_reta', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento', 'estabilidade_lateral', 'flechas_els']
-        mostrar_verificacoes = {key: key in verificacoes_selecionadas_lista for key in chaves_sel}
-        mostrar_verificacoes.update({
-            'compressao_estabilidade': mostrar_verificacoes.get('compressao_simples_resistencia', False),
-            'flechas_qp': mostrar_verificacoes.get('flechas_els', False),
-            'flechas_vento': mostrar_verificacoes.get('flechas_els', False)
-        })
-        print(f"DEBUG: /calcular - mostrar_verificacoes: {mostrar_verificacoes}")
-
-        global tabelas_madeira 
-        tipo_tabela_val = validar_selecao(form_data.get('tipo_tabela'), 'Tipo de Tabela', ["estrutural", "nativa"])
-        classes_validas = list(tabelas_madeira.get(tipo_tabela_val, {}).keys()) if tabelas_madeira.get(tipo_tabela_val) else []
-        if not classes_validas: raise ValueError(f"Nenhuma classe de madeira encontrada para o tipo de tabela '{tipo_tabela_val}'.")
-
-        dados_validados = {
-            'tipo_tabela': tipo_tabela_val,
-            'classe_madeira': validar_selecao(form_data.get('classe_madeira'), 'Classe da Madeira', classes_validas),
-            'classe_carregamento': validar_selecao(form_data.get('classe_carregamento'), 'Classe Carregamento', list(kmod1_valores.keys()) if kmod1_valores else []),
-            'classe_umidade': validar_selecao(form_data.get('classe_umidade'), 'Classe Umidade', list(kmod2_valores.keys()) if kmod2_valores else []),
-            'comprimento_m': validar_float(form_data.get('comprimento'), 'Comprimento (m)', False, False, 0.001),
-            'largura_mm': validar_float(form_data.get('largura_mm'), 'Largura (mm)', False, False, 0.1),
-            'altura_mm': validar_float(form_data.get('altura_mm'), 'Altura (mm)', False, False, 0.1),
-            'tipo_peca_dim': validar_selecao(form_data.get('tipo_peca_dim'), 'Tipo Peça (Dim. Mín.)', ["principal_isolada", "secundaria_isolada", "principal_multipla", "secundaria_multipla"]),
-            'alpha_n': validar_float(form_data.get('alpha_n', '1.0'), 'alpha_n', False, False, 1.0, 2.0),
-            'Ke_x': validar_float(form_data.get('Ke_x', '1.0'), 'Ke_x', False, False, 0.5),
-            'Ke_y': validar_float(form_data.get('Ke_y', '1.0'), 'Ke_y', False, False, 0.5),
-            'tipo_madeira_beta_c': validar_selecao(form_data.get('tipo_madeira_beta_c', 'serrada'), 'Tipo Madeira (beta_c)', ['serrada', 'mlc']),
-            'N_sd_t0_input': validar_float(form_data.get('tracao_paralela_sd', '0'), 'Tração Paralela ELU (N)', True, False, 0.0),
-            'N_sd_c0_input': validar_float(form_data.get('compressao_paralela_sd', '0'), 'Compressão Paralela ELU (N)', True, False, 0.0),
-            'N_sd_t90_input': validar_float(form_data.get('tracao_perpendicular_sd', '0'), 'Tração Perp. ELU (N)', True, False, 0.0),
-            'N_sd_c90_input': validar_float(form_data.get('compressao_perpendicular_sd', '0'), 'Compressão Perp. ELU (N)', True, False, 0.0),
-            'V_sd_input': validar_float(form_data.get('forca_cortante_sd', '0'), 'Força Cortante ELU (N)', True, True), 
-            'M_sd_x_Nm_input': validar_float(form_data.get('momento_x_sd', '0'), 'Momento X ELU (N.m)', True, True), 
-            'M_sd_y_Nm_input': validar_float(form_data.get('momento_y_sd', '0'), 'Momento Y ELU (N.m)', True, True), 
-            'L1_mm': validar_float(form_data.get('L1_mm', '0'), 'L1 (mm)', True, False, 0.0), 
-            'carga_els_qp_x': validar_float(form_data.get('carga_els_qp_x', '0'), 'Carga ELS QP X (N/m)', True, True), 
-            'carga_els_qp_y': validar_float(form_data.get('carga_els_qp_y', '0'), 'Carga ELS QP Y (N/m)', True, True), 
-            'carga_els_vento_x': validar_float(form_data.get('carga_els_vento_x', '0'), 'Carga ELS Vento X (N/m)', True, True), 
-            'carga_els_vento_y': validar_float(form_data.get('carga_els_vento_y', '0'), 'Carga ELS Vento Y (N/m)', True, True), 
-            'verificacoes_selecionadas': verificacoes_selecionadas_lista 
-        }
-        dados_validados['comprimento_mm'] = dados_validados['comprimento_m'] * 1000 
-
-        resultados_calculados = realizar_calculo_completo(dados_validados)
-        resultados_calculados['mostrar_verificacoes'] = mostrar_verificacoes 
-        resultados_calculados['inputs'] = input_data_storage_for_link 
-
-        return render_template('relatorio.html', resultados=resultados_calculados, TOL=TOL, max=max, abs=abs, log_message=log_message_for_template)
-
-    except (ValueError, KeyError, NameError, ImportError, ZeroDivisionError) as e:
-        current_inputs_for_error = input_data_storage_for_link if input_data_storage_for_link else dict(request.form) 
-        if 'verificacoes_selecionadas' not in current_inputs_for_error: 
-            current_inputs_for_error['verificacoes_selecionadas'] = request.form.getlist('verificacoes_selecionadas')
-        msg_erro = f"Erro ao processar dados: {str(e)}"
-        print(f"Erro /calcular: {msg_erro}\n{traceback.format_exc()}")
-        return render_template('erro.html', mensagem=msg_erro, inputs=current_inputs_for_error, log_message=log_message_for_template), 400
+        _log.debug("/calcular - verificacoes_selecionadas_lista DO FORM: %s", verificacoes_selecionadas_lista)
+
+        input_data_storage_for_link = form_data.to_dict(flat=True)
+        if 'verificacoes_selecionadas' in input_data_storage_for_link: input_data_storage_for_link['verificacoes_selecionadas'] = verificacoes_selecionadas_lista
+        _log.debug("/calcular - input_data_storage_for_link P/ URL: %s", input_data_storage_for_link)
+
+        resultados_calculados = _calcular_relatorio("/calcular", input_data_storage_for_link, verificacoes_selecionadas_lista, _ESQUEMA_CALCULAR, 'Classe da Madeira')
+
+        return render_template(_TPL_RELATORIO, resultados=resultados_calculados)
+
     except Exception as e:
-        current_inputs_for_error = input_data_storage_for_link if input_data_storage_for_link else dict(request.form)
-        if 'verificacoes_selecionadas' not in current_inputs_for_error:
-            current_inputs_for_error['verificacoes_selecionadas'] = request.form.getlist('verificacoes_selecionadas')
-        print("="*20 + " ERRO INESPERADO (/calcular) " + "="*20); traceback.print_exc(); print("="*68)
-        msg_erro = f"Ocorreu um erro inesperado no servidor: {type(e).__name__}"
-        return render_template('erro.html', mensagem=msg_erro, inputs=current_inputs_for_error, log_message=log_message_for_template), 500
+        return _resposta_erro(e, "/calcular", "Erro ao processar dados", input_data_storage_for_link, request.form)
 
 @app.route('/relatorio_detalhado')
 def relatorio_detalhado():
@@ -689,104 +992,52 @@ def relatorio_detalhado():
     Renderiza o relatório detalhado com base nos dados passados via query string.
     Esses dados são os mesmos que foram submetidos no formulário original.
     """
-    print("DEBUG: --- Rota /relatorio_detalhado CHAMADA ---")
+    _log.debug("--- Rota /relatorio_detalhado CHAMADA ---")
+    etag = _etag_relatorio(request.query_string)
+    # O navegador já tem esta página: nem valida, nem renderiza. O ETag só é enviado com um relatório válido,
+    # então só uma cópia concreta (forte ou W/) casa; '*' não garante isso e segue para a validação.
+    if not request.if_none_match.star_tag and request.if_none_match.contains_weak(etag):
+        resposta = make_response('', 304); resposta.set_etag(etag)
+        return resposta
     input_data_from_url = {} 
     try:
-        if not MODULO_CALCULOS_OK: raise ImportError("Módulo de cálculos não carregado.")
-        print(f"DEBUG: /relatorio_detalhado - request.args: {request.args}") 
+        _log.debug("/relatorio_detalhado - request.args: %s", request.args) 
 
         verificacoes_selecionadas_lista = request.args.getlist('verificacoes_selecionadas')
-        print(f"DEBUG: /relatorio_detalhado - verificacoes_selecionadas_lista DA URL: {verificacoes_selecionadas_lista}")
+        _log.debug("/relatorio_detalhado - verificacoes_selecionadas_lista DA URL: %s", verificacoes_selecionadas_lista)
 
         input_data_from_url = {key: request.args.get(key) for key in request.args if key != 'verificacoes_selecionadas'}
         input_data_from_url['verificacoes_selecionadas'] = verificacoes_selecionadas_lista 
-        print(f"DEBUG: /relatorio_detalhado - input_data_from_url (para validação): {input_data_from_url}")
-
-        chaves_sel = ['dimensoes', 'tracao_simples', 'tracao_perpendicular', 'compressao_simples_resistencia', 'compressao_perpendicular', 'flexao_simples_reta', 'flexao_obliqua', 'flexotracao', 'flexocompressao', 'cisalhamento', 'estabilidade_lateral', 'flechas_els']
-        mostrar_verificacoes = {key: key in verificacoes_selecionadas_lista for key in chaves_sel}
-        mostrar_verificacoes.update({ 
-            'compressao_estabilidade': mostrar_verificacoes.get('compressao_simples_resistencia', False),
-            'flechas_qp': mostrar_verificacoes.get('flechas_els', False),
-            'flechas_vento': mostrar_verificacoes.get('flechas_els', False)
-        })
-        print(f"DEBUG: /relatorio_detalhado - mostrar_verificacoes: {mostrar_verificacoes}")
-
-        global tabelas_madeira
-        tipo_tabela_val = validar_selecao(input_data_from_url.get('tipo_tabela'), 'Tipo de Tabela', ["estrutural", "nativa"])
-        classes_validas = list(tabelas_madeira.get(tipo_tabela_val, {}).keys()) if tabelas_madeira.get(tipo_tabela_val) else []
-        if not classes_validas: raise ValueError(f"Nenhuma classe para tabela '{tipo_tabela_val}'.")
-
-        dados_validados = { 
-            'tipo_tabela': tipo_tabela_val,
-            'classe_madeira': validar_selecao(input_data_from_url.get('classe_madeira'), 'Classe Madeira', classes_validas),
-            'classe_carregamento': validar_selecao(input_data_from_url.get('classe_carregamento'), 'Classe Carregamento', list(kmod1_valores.keys()) if kmod1_valores else []),
-            'classe_umidade': validar_selecao(input_data_from_url.get('classe_umidade'), 'Classe Umidade', list(kmod2_valores.keys()) if kmod2_valores else []),
-            'comprimento_m': validar_float(input_data_from_url.get('comprimento', input_data_from_url.get('comprimento_m', '0')), 'Comprimento (m)'), 
-            'largura_mm': validar_float(input_data_from_url.get('largura_mm', '0'), 'Largura (mm)'),
-            'altura_mm': validar_float(input_data_from_url.get('altura_mm', '0'), 'Altura (mm)'),
-            'tipo_peca_dim': validar_selecao(input_data_from_url.get('tipo_peca_dim', 'principal_isolada'), 'Tipo Peça'), 
-            'alpha_n': validar_float(input_data_from_url.get('alpha_n', '1.0'), 'alpha_n'),
-            'Ke_x': validar_float(input_data_from_url.get('Ke_x', '1.0'), 'Ke_x'),
-            'Ke_y': validar_float(input_data_from_url.get('Ke_y', '1.0'), 'Ke_y'),
-            'tipo_madeira_beta_c': validar_selecao(input_data_from_url.get('tipo_madeira_beta_c', 'serrada'), 'Tipo Madeira (beta_c)'), 
-            'N_sd_t0_input': validar_float(input_data_from_url.get('tracao_paralela_sd', input_data_from_url.get('N_sd_t0_input', '0')), 'Tração Paralela'), 
-            'N_sd_c0_input': validar_float(input_data_from_url.get('compressao_paralela_sd', input_data_from_url.get('N_sd_c0_input', '0')), 'Compressão Paralela'),
-            'N_sd_t90_input': validar_float(input_data_from_url.get('tracao_perpendicular_sd', input_data_from_url.get('N_sd_t90_input', '0')), 'Tração Perp.'),
-            'N_sd_c90_input': validar_float(input_data_from_url.get('compressao_perpendicular_sd', input_data_from_url.get('N_sd_c90_input', '0')), 'Compressão Perp.'),
-            'V_sd_input': validar_float(input_data_from_url.get('forca_cortante_sd', input_data_from_url.get('V_sd_input', '0')), 'Força Cortante', permitir_negativo=True),
-            'M_sd_x_Nm_input': validar_float(input_data_from_url.get('momento_x_sd', input_data_from_url.get('M_sd_x_Nm_input', '0')), 'Momento X', permitir_negativo=True),
-            'M_sd_y_Nm_input': validar_float(input_data_from_url.get('momento_y_sd', input_data_from_url.get('M_sd_y_Nm_input', '0')), 'Momento Y', permitir_negativo=True),
-            'L1_mm': validar_float(input_data_from_url.get('L1_mm', '0'), 'L1'), 
-            'carga_els_qp_x': validar_float(input_data_from_url.get('carga_els_qp_x', '0'), 'Carga QP X', permitir_negativo=True), 
-            'carga_els_qp_y': validar_float(input_data_from_url.get('carga_els_qp_y', '0'), 'Carga QP Y', permitir_negativo=True), 
-            'carga_els_vento_x': validar_float(input_data_from_url.get('carga_els_vento_x', '0'), 'Carga Vento X', permitir_negativo=True), 
-            'carga_els_vento_y': validar_float(input_data_from_url.get('carga_els_vento_y', '0'), 'Carga Vento Y', permitir_negativo=True), 
-            'verificacoes_selecionadas': verificacoes_selecionadas_lista
-        }
-        dados_validados['comprimento_mm'] = dados_validados['comprimento_m'] * 1000
-        print(f"DEBUG: /relatorio_detalhado - dados_validados ANTES de calc: verificacoes_selecionadas={dados_validados.get('verificacoes_selecionadas')}")
-
-        resultados_calculados = realizar_calculo_completo(dados_validados)
-        resultados_calculados['mostrar_verificacoes'] = mostrar_verificacoes
-        resultados_calculados['inputs'] = input_data_from_url 
-
-        return render_template('relatorio_detalhado.html', resultados=resultados_calculados, TOL=TOL, abs=abs, max=max, GAMMA_C=GAMMA_C, GAMMA_T=GAMMA_T, GAMMA_M=GAMMA_M, GAMMA_V=GAMMA_V, log_message=log_message_for_template)
-
-    except (ValueError, KeyError, NameError, ImportError, ZeroDivisionError) as e:
-        current_inputs_for_error = input_data_from_url if input_data_from_url else dict(request.args)
-        if 'verificacoes_selecionadas' not in current_inputs_for_error:
-            current_inputs_for_error['verificacoes_selecionadas'] = request.args.getlist('verificacoes_selecionadas')
-        msg_erro = f"Erro ao gerar relatório detalhado: {str(e)}"
-        print(f"Erro /relatorio_detalhado: {msg_erro}\n{traceback.format_exc()}")
-        return render_template('erro.html', mensagem=msg_erro, inputs=current_inputs_for_error, log_message=log_message_for_template), 400
+        _log.debug("/relatorio_detalhado - input_data_from_url (para validação): %s", input_data_from_url)
+
+        resultados_calculados = _calcular_relatorio("/relatorio_detalhado", input_data_from_url, verificacoes_selecionadas_lista, _ESQUEMA_RELATORIO, 'Classe Madeira')
+
+        resposta = make_response(render_template(_TPL_RELATORIO_DETALHADO, resultados=resultados_calculados))
+        resposta.set_etag(etag); resposta.headers['Cache-Control'] = 'private, max-age=300'
+        return resposta
+
     except Exception as e:
-        current_inputs_for_error = input_data_from_url if input_data_from_url else dict(request.args)
-        if 'verificacoes_selecionadas' not in current_inputs_for_error:
-            current_inputs_for_error['verificacoes_selecionadas'] = request.args.getlist('verificacoes_selecionadas')
-        print("="*20 + " ERRO INESPERADO (/relatorio_detalhado) " + "="*20); traceback.print_exc(); print("="*68)
-        msg_erro = f"Ocorreu um erro inesperado no servidor: {type(e).__name__}"
-        return render_template('erro.html', mensagem=msg_erro, inputs=current_inputs_for_error, log_message=log_message_for_template), 500
+        return _resposta_erro(e, "/relatorio_detalhado", "Erro ao gerar relatório detalhado", input_data_from_url, request.args)
 
 @app.route('/erro')
 def pagina_erro():
-    """Renderiza uma página de erro genérica."""
+    """
+    Renderiza uma página de erro genérica.
+    O parâmetro opcional 'inputs' é um objeto JSON codificado em base64 urlsafe.
+    """
     mensagem = request.args.get('mensagem', 'Ocorreu um erro desconhecido.')
     inputs_str = request.args.get('inputs') 
     inputs_dict = {}
     if inputs_str:
         try:
-            import ast
-            inputs_dict = ast.literal_eval(inputs_str) 
-        except:
-            inputs_dict = {'raw_inputs_str': inputs_str} if inputs_str else {} 
-    return render_template('erro.html', mensagem=mensagem, inputs=inputs_dict, log_message=log_message_for_template)
+            inputs_dict = json.loads(base64.urlsafe_b64decode(inputs_str))
+            if not isinstance(inputs_dict, dict): raise ValueError("'inputs' deve ser um objeto JSON.")
+        except ValueError: # inclui JSONDecodeError, binascii.Error e UnicodeDecodeError
+            inputs_dict = {'raw_inputs_str': inputs_str}
+    return render_template(_TPL_ERRO, mensagem=mensagem, inputs=inputs_dict)
 
 if __name__ == '__main__':
-    porta_app = int(os.environ.get("PORT", 5000)) 
-    if not MODULO_CALCULOS_OK:
-        print("\n!!! AVISO: O módulo 'calculos_madeira.py' NÃO FOI CARREGADO CORRETAMENTE. !!!")
-        print("!!! A aplicação pode não funcionar como esperado. Verifique os erros de importação. !!!\n")
-    else:
-        print("INFO: Módulo 'calculos_madeira.py' carregado e pronto para uso.")
-    print(f"INFO: Servidor Flask iniciando em http://0.0.0.0:{porta_app}")
-    app.run(debug=True, host='0.0.0.0', port=porta_app)
+    # Servidor de desenvolvimento. Em produção a aplicação roda sob o gunicorn (ver Procfile), com
+    # --preload para que os módulos e caches sejam carregados uma vez e compartilhados pelos workers.
+    _log.info("Servidor Flask iniciando em http://0.0.0.0:%s (debug=%s)", PORTA_APP, MODO_DEBUG)
+    app.run(debug=MODO_DEBUG, host='0.0.0.0', port=PORTA_APP)
@@ -20,7 +20,11 @@ Referências principais:
 """
 
 import math
-import traceback
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+
+_log = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------------
 # Constantes (Coeficientes de Minoração - Item 5.8.5 NBR 7190-1:2022)
@@ -103,9 +107,11 @@ kmod_fluencia_valores = { # Tabela 20 NBR 7190:2022
 # --------------------------------------------------------------------------
 # Funções de Cálculo Kmod
 # --------------------------------------------------------------------------
+@lru_cache(maxsize=64)
 def calcular_kmod1(classe_carregamento, tipo_madeira="serrada"):
     """
     Calcula o coeficiente kmod1 conforme Tabela 4 da NBR 7190-1:2022.
+    O resultado é memorizado (entradas categóricas).
 
     Args:
         classe_carregamento (str): Classe de carregamento ('permanente', 'longa', etc.).
@@ -129,9 +135,11 @@ def calcular_kmod1(classe_carregamento, tipo_madeira="serrada"):
         raise ValueError(f"Classe de carregamento '{classe_carregamento}' inválida.")
     return kmod1
 
+@lru_cache(maxsize=64)
 def calcular_kmod2(classe_umidade, tipo_madeira="serrada"):
     """
     Calcula o coeficiente kmod2 conforme Tabela 5 da NBR 7190-1:2022.
+    O resultado é memorizado (entradas categóricas).
 
     Args:
         classe_umidade (str): Classe de umidade ('classe_1', 'classe_2', etc.).
@@ -161,7 +169,7 @@ def calcular_kmod2(classe_umidade, tipo_madeira="serrada"):
         # No entanto, a Tabela 5 possui uma coluna "Madeira recomposta".
         # Se `tipo_madeira` for explicitamente "recomposta", essa lógica precisaria ser ajustada.
         # Por ora, se não for um dos tipos principais, imprime um aviso e usa o valor de serrada.
-        print(f"AVISO: Tipo de madeira '{tipo_madeira}' não mapeado explicitamente para kmod2 na Tabela 5. Usando valores de madeira serrada/MLC.")
+        _log.warning("Tipo de madeira '%s' não mapeado explicitamente para kmod2 na Tabela 5. Usando valores de madeira serrada/MLC.", tipo_madeira)
 
     kmod2 = kmod2_valores.get(classe_umidade)
     if kmod2 is None:
@@ -228,19 +236,20 @@ def obter_G_med(propriedades):
     g_med_tabela = propriedades.get("G_med")
     if g_med_tabela is not None:
         if not isinstance(g_med_tabela, (int, float)) or g_med_tabela <= TOL:
-            print(f"AVISO: G_med da tabela ({g_med_tabela}) é inválido. Tentando estimar.")
+            _log.warning("G_med da tabela (%s) é inválido. Tentando estimar.", g_med_tabela)
         else:
             return g_med_tabela
     try:
         e0_med = obter_E0_med(propriedades)
         return e0_med / 16.0
     except (KeyError, ValueError) as e:
-        print(f"AVISO: Não foi possível calcular G_med a partir de E_0,med devido a: {e}. Retornando None.")
+        _log.warning("Não foi possível calcular G_med a partir de E_0,med devido a: %s. Retornando None.", e)
         return None
 
 def obter_propriedades_madeira(tipo_tabela, classe_madeira):
     """
     Busca as propriedades da madeira de `tabelas_madeira` e adiciona G_med calculado.
+    A consulta é memorizada em `_propriedades_madeira`; cada chamada recebe uma cópia própria.
 
     Args:
         tipo_tabela (str): 'estrutural' (Tabela 3) ou 'nativa' (Tabela 2).
@@ -253,6 +262,11 @@ def obter_propriedades_madeira(tipo_tabela, classe_madeira):
         ValueError: Se o tipo_tabela for inválido.
         KeyError: Se a classe_madeira for inválida ou se propriedades essenciais faltarem.
     """
+    return dict(_propriedades_madeira(tipo_tabela, classe_madeira))
+
+@lru_cache(maxsize=256)
+def _propriedades_madeira(tipo_tabela, classe_madeira):
+    """Consulta memorizada de `obter_propriedades_madeira`; retorna uma vista somente-leitura."""
     tabela_selecionada = tabelas_madeira.get(tipo_tabela)
     if not tabela_selecionada:
         raise ValueError(f"Tipo de tabela '{tipo_tabela}' inválido. Use 'estrutural' ou 'nativa'.")
@@ -280,7 +294,7 @@ def obter_propriedades_madeira(tipo_tabela, classe_madeira):
     if 'G_med' not in propriedades or propriedades['G_med'] is None:
         propriedades['G_med'] = obter_G_med(propriedades.copy()) # Passa uma cópia para evitar modificar o original na chamada
 
-    return propriedades.copy() # Retorna uma cópia para evitar modificação externa da tabela original
+    return MappingProxyType(propriedades.copy()) # Cópia somente-leitura: a tabela original não é exposta
 
 def obter_E0_05(propriedades):
     """
@@ -407,7 +421,7 @@ def calcular_f_c90d(f_c90k, f_c0d_calc, alpha_n, k_mod):
     f_c90d_base = k_mod * f_c90k / GAMMA_C
 
     if f_c0d_calc is None or f_c0d_calc < TOL: # f_c0d_calc pode ser zero se f_c0k for zero, mas já validado
-         print("AVISO: f_c0d_calc inválido para calcular o limite de f_c90d. Usando valor base de f_c90d.")
+         _log.warning("f_c0d_calc inválido para calcular o limite de f_c90d. Usando valor base de f_c90d.")
          return f_c90d_base
 
     limite_superior_norma = 0.25 * f_c0d_calc * alpha_n
@@ -473,6 +487,8 @@ def calcular_f_md(f_mk, f_c0d_calc, k_mod, tipo_tabela):
 def calcular_propriedades_geometricas(largura_b, altura_h):
     """
     Calcula propriedades geométricas para uma seção retangular.
+    O cálculo é memorizado em `_propriedades_geometricas` (a mesma seção se repete entre
+    requisições com esforços diferentes); cada chamada recebe uma cópia própria.
 
     Args:
         largura_b (float): Largura da seção (mm).
@@ -484,6 +500,11 @@ def calcular_propriedades_geometricas(largura_b, altura_h):
     Raises:
         ValueError: Se largura_b ou altura_h não forem positivos.
     """
+    return dict(_propriedades_geometricas(largura_b, altura_h))
+
+@lru_cache(maxsize=256)
+def _propriedades_geometricas(largura_b, altura_h):
+    """Cálculo memorizado de `calcular_propriedades_geometricas`; retorna uma vista somente-leitura."""
     if largura_b <= TOL or altura_h <= TOL:
         raise ValueError(f"Dimensões da seção b ({largura_b}) e h ({altura_h}) devem ser positivas.")
 
@@ -503,7 +524,7 @@ def calcular_propriedades_geometricas(largura_b, altura_h):
     raio_ix = math.sqrt(i_x / area) if area > TOL and i_x >= 0 else 0.0
     raio_iy = math.sqrt(i_y / area) if area > TOL and i_y >= 0 else 0.0
 
-    return {"area": area, "I_x": i_x, "I_y": i_y, "W_x": w_x, "W_y": w_y, "i_x": raio_ix, "i_y": raio_iy}
+    return MappingProxyType({"area": area, "I_x": i_x, "I_y": i_y, "W_x": w_x, "W_y": w_y, "i_x": raio_ix, "i_y": raio_iy})
 
 # --------------------------------------------------------------------------
 # Verificações ELU (Estado Limite Último)
@@ -522,15 +543,16 @@ def verificar_tracao_simples(N_sd_t, A, f_t0d):
     Returns:
         tuple: (passou (bool), N_sd_t (float), N_Rd_t (float), ratio (float))
     """
-    if A <= TOL: return False, abs(N_sd_t), 0.0, float('inf') if abs(N_sd_t) > TOL else 0.0
+    N_sd_t_abs = abs(N_sd_t)
+    if A <= TOL: return False, N_sd_t_abs, 0.0, float('inf') if N_sd_t_abs > TOL else 0.0
     if f_t0d <= TOL: # Se resistência é zero ou negligível
-        passou = abs(N_sd_t) < TOL # Passa apenas se esforço também for zero
-        return passou, abs(N_sd_t), 0.0, 0.0 if passou else float('inf')
+        passou = N_sd_t_abs < TOL # Passa apenas se esforço também for zero
+        return passou, N_sd_t_abs, 0.0, 0.0 if passou else float('inf')
 
     N_Rd_t = f_t0d * A  # Força resistente de cálculo
-    passou = abs(N_sd_t) <= N_Rd_t + TOL
-    ratio = abs(N_sd_t) / N_Rd_t if N_Rd_t > TOL else (0.0 if passou else float('inf'))
-    return passou, abs(N_sd_t), N_Rd_t, ratio
+    passou = N_sd_t_abs <= N_Rd_t + TOL
+    ratio = N_sd_t_abs / N_Rd_t if N_Rd_t > TOL else (0.0 if passou else float('inf'))
+    return passou, N_sd_t_abs, N_Rd_t, ratio
 
 def verificar_compressao_perpendicular(N_sd_90, area_apoio, f_c90d):
     """
@@ -546,15 +568,16 @@ def verificar_compressao_perpendicular(N_sd_90, area_apoio, f_c90d):
     Returns:
         tuple: (passou (bool), N_sd_90 (float), N_Rd_90 (float), ratio (float))
     """
-    if area_apoio <= TOL: return False, abs(N_sd_90), 0.0, float('inf') if abs(N_sd_90) > TOL else 0.0
+    N_sd_90_abs = abs(N_sd_90)
+    if area_apoio <= TOL: return False, N_sd_90_abs, 0.0, float('inf') if N_sd_90_abs > TOL else 0.0
     if f_c90d <= TOL:
-        passou = abs(N_sd_90) < TOL
-        return passou, abs(N_sd_90), 0.0, 0.0 if passou else float('inf')
+        passou = N_sd_90_abs < TOL
+        return passou, N_sd_90_abs, 0.0, 0.0 if passou else float('inf')
 
     N_Rd_90 = f_c90d * area_apoio # Força resistente de cálculo
-    passou = abs(N_sd_90) <= N_Rd_90 + TOL
-    ratio = abs(N_sd_90) / N_Rd_90 if N_Rd_90 > TOL else (0.0 if passou else float('inf'))
-    return passou, abs(N_sd_90), N_Rd_90, ratio
+    passou = N_sd_90_abs <= N_Rd_90 + TOL
+    ratio = N_sd_90_abs / N_Rd_90 if N_Rd_90 > TOL else (0.0 if passou else float('inf'))
+    return passou, N_sd_90_abs, N_Rd_90, ratio
 
 def verificar_cisalhamento(V_sd, A, f_vd):
     """
@@ -670,11 +693,9 @@ def verificar_flexotracao(N_sd_t, M_sdx, M_sdy, A, Wx, Wy, f_t0d, f_md, k_M):
     # Termo da tração normalizada
     termo_N = abs(N_sd_t) / (A * f_t0d) if abs(A * f_t0d) > TOL else (float('inf') if abs(N_sd_t) > TOL else 0.0)
 
-    # Termos da flexão normalizada
-    sigma_Mx_d = abs(M_sdx) / Wx if Wx > TOL else (float('inf') if abs(M_sdx) > TOL else 0.0)
-    sigma_My_d = abs(M_sdy) / Wy if Wy > TOL else (float('inf') if abs(M_sdy) > TOL else 0.0)
-    termo_Mx = sigma_Mx_d / f_md if f_md > TOL else (float('inf') if sigma_Mx_d > TOL else 0.0)
-    termo_My = sigma_My_d / f_md if f_md > TOL else (float('inf') if sigma_My_d > TOL else 0.0)
+    # Termos da flexão normalizada (Wx, Wy e f_md já garantidos > TOL pelos retornos acima)
+    termo_Mx = abs(M_sdx) / Wx / f_md
+    termo_My = abs(M_sdy) / Wy / f_md
 
     # Condições de interação
     ratio1 = termo_N + termo_Mx + k_M * termo_My
@@ -758,7 +779,7 @@ def calcular_coeficiente_reducao_kc(lambda_rel, beta_c=0.2):
 
     # Trata caso de instabilidade numérica ou real onde termo_raiz_quad < 0
     if termo_raiz_quad < -TOL: # Usar uma pequena tolerância para erros de ponto flutuante
-         print(f"AVISO NUMÉRICO: Termo sob a raiz quadrada (k² - λ_rel²) é negativo ({termo_raiz_quad:.2e}) para λ_rel={lambda_rel:.3f}, k_val={k_val:.3f}. Retornando kc próximo de zero, indicando instabilidade.")
+         _log.warning("Termo sob a raiz quadrada (k² - λ_rel²) é negativo (%.2e) para λ_rel=%.3f, k_val=%.3f. Retornando kc próximo de zero, indicando instabilidade.", termo_raiz_quad, lambda_rel, k_val)
          return TOL # Retorna um valor muito pequeno, efetivamente falhando na estabilidade
     elif termo_raiz_quad < 0: # Se for negativo mas muito próximo de zero
         termo_raiz_quad = 0 # Corrige para zero para evitar erro de math.domain
@@ -768,12 +789,42 @@ def calcular_coeficiente_reducao_kc(lambda_rel, beta_c=0.2):
 
     if denominador_kc <= TOL:
         # Isso indica que a peça é extremamente esbelta e instável
-        print(f"AVISO: Denominador no cálculo de kc é zero ou negativo ({denominador_kc:.2e}) para λ_rel={lambda_rel:.3f}. Peça instável.")
+        _log.warning("Denominador no cálculo de kc é zero ou negativo (%.2e) para λ_rel=%.3f. Peça instável.", denominador_kc, lambda_rel)
         return TOL # Retorna um valor muito pequeno
 
     kc = 1 / denominador_kc # Eq. 14
     return min(kc, 1.0) # Garante que kc não seja maior que 1.0
 
+@lru_cache(maxsize=256)
+def calcular_parametros_estabilidade(comprimento_L, Ke_x, Ke_y, i_x, i_y, f_c0k, E_005, beta_c=0.2):
+    """
+    Calcula os índices de esbeltez e os coeficientes kc nas duas direções.
+    Compartilhado pela compressão axial e pela flexocompressão com estabilidade; o resultado
+    só depende de escalares e é memorizado.
+
+    Args:
+        comprimento_L (float): Comprimento da peça (mm).
+        Ke_x (float): Coef. de flambagem em torno de x.
+        Ke_y (float): Coef. de flambagem em torno de y.
+        i_x (float): Raio de giração em x (mm).
+        i_y (float): Raio de giração em y (mm).
+        f_c0k (float): Resistência característica à compressão paralela (MPa).
+        E_005 (float): Módulo de elasticidade característico (MPa).
+        beta_c (float, optional): Fator para kc. Default 0.2.
+
+    Returns:
+        tuple: (lambda_x, lambda_y, lambda_rel_x, lambda_rel_y, kc_x, kc_y)
+
+    Raises:
+        ValueError: Se algum parâmetro for inválido (propagado de calcular_indices_esbeltez).
+    """
+    lambda_x, lambda_rel_x = calcular_indices_esbeltez(comprimento_L, Ke_x, i_x, f_c0k, E_005)
+    lambda_y, lambda_rel_y = calcular_indices_esbeltez(comprimento_L, Ke_y, i_y, f_c0k, E_005)
+    # kc = 1.0 quando lambda_rel <= 0.3 (Item 6.5.5), então pode ser calculado sempre
+    kc_x = calcular_coeficiente_reducao_kc(lambda_rel_x, beta_c)
+    kc_y = calcular_coeficiente_reducao_kc(lambda_rel_y, beta_c)
+    return lambda_x, lambda_y, lambda_rel_x, lambda_rel_y, kc_x, kc_y
+
 def verificar_compressao_axial_com_estabilidade(N_sd_c, A, f_c0k, f_c0d, E_005, comprimento_L, Ke_x=1.0, Ke_y=1.0, i_x=None, i_y=None, props_geom=None, beta_c=0.2):
     """
     Verifica ELU para compressão axial, incluindo resistência da seção e estabilidade.
@@ -832,19 +883,12 @@ def verificar_compressao_axial_com_estabilidade(N_sd_c, A, f_c0k, f_c0d, E_005,
             raise ValueError(f"Raios de giração ix ({ix_calc}) ou iy ({iy_calc}) inválidos.")
 
         try:
-            lambda_x, lambda_rel_x = calcular_indices_esbeltez(comprimento_L, Ke_x, ix_calc, f_c0k, E_005)
-            lambda_y, lambda_rel_y = calcular_indices_esbeltez(comprimento_L, Ke_y, iy_calc, f_c0k, E_005)
+            lambda_x, lambda_y, lambda_rel_x, lambda_rel_y, kc_x, kc_y = calcular_parametros_estabilidade(comprimento_L, Ke_x, Ke_y, ix_calc, iy_calc, f_c0k, E_005, beta_c)
         except ValueError as e:
              raise ValueError(f"Erro ao calcular índices de esbeltez para compressão: {e}") from e
 
         # Verifica se a estabilidade precisa ser considerada (lambda_rel > 0.3)
         if lambda_rel_x > 0.3 + TOL or lambda_rel_y > 0.3 + TOL:
-            try:
-                kc_x = calcular_coeficiente_reducao_kc(lambda_rel_x, beta_c)
-                kc_y = calcular_coeficiente_reducao_kc(lambda_rel_y, beta_c)
-            except ValueError as e:
-                 raise ValueError(f"Erro ao calcular coeficientes kc para compressão: {e}") from e
-
             kc_min = min(kc_x, kc_y)
             N_Rd_estabilidade = kc_min * f_c0d * A
             passou_estabilidade_forca_apenas = N_sd_c_abs <= N_Rd_estabilidade + TOL
@@ -896,10 +940,11 @@ def verificar_flexocompressao_resistencia(N_sd_c, M_sdx, M_sdy, A, Wx, Wy, f_c0d
     sigma_Msdx = abs(M_sdx) / Wx
     sigma_Msdy = abs(M_sdy) / Wy
 
-    # Termos da equação de interação (Item 6.3.7)
-    termo_comp_quad = (sigma_Ncd / f_c0d)**2 if f_c0d > TOL else (float('inf') if sigma_Ncd > TOL else 0.0)
-    termo_flex_x = sigma_Msdx / f_md if f_md > TOL else (float('inf') if sigma_Msdx > TOL else 0.0)
-    termo_flex_y = sigma_Msdy / f_md if f_md > TOL else (float('inf') if sigma_Msdy > TOL else 0.0)
+    # Termos da equação de interação (Item 6.3.7); f_c0d e f_md já garantidos > TOL acima
+    termo_comp = sigma_Ncd / f_c0d
+    termo_comp_quad = termo_comp * termo_comp
+    termo_flex_x = sigma_Msdx / f_md
+    termo_flex_y = sigma_Msdy / f_md
 
     ratio1 = termo_comp_quad + termo_flex_x + k_M * termo_flex_y
     ratio2 = termo_comp_quad + k_M * termo_flex_x + termo_flex_y
@@ -908,7 +953,7 @@ def verificar_flexocompressao_resistencia(N_sd_c, M_sdx, M_sdy, A, Wx, Wy, f_c0d
     passou = ratio_max <= 1.0 + TOL
     return passou, ratio_max
 
-def verificar_flexocompressao_com_estabilidade(N_sd_c, M_sdx, M_sdy, A, Wx, Wy, f_c0k, f_c0d, f_md, E_005, comprimento_L, Ke_x, Ke_y, props_geom, beta_c, k_M):
+def verificar_flexocompressao_com_estabilidade(N_sd_c, M_sdx, M_sdy, A, Wx, Wy, f_c0k, f_c0d, f_md, E_005, comprimento_L, Ke_x, Ke_y, props_geom, beta_c, k_M, i_x=None, i_y=None):
     """
     Verifica a estabilidade para flexocompressão (ELU).
     Ref: NBR 7190-1:2022, Item 6.5.5, Eq. 13.
@@ -917,6 +962,8 @@ def verificar_flexocompressao_com_estabilidade(N_sd_c, M_sdx, M_sdy, A, Wx, Wy,
     Args:
         (Mesmos da flexocompressao_resistencia + E_005, comprimento_L, Ke_x, Ke_y, props_geom, beta_c)
         f_c0k (float): Resistência característica à compressão paralela (MPa).
+        i_x (float, optional): Raio de giração em x (mm). Usado se props_geom não fornecido.
+        i_y (float, optional): Raio de giração em y (mm). Usado se props_geom não fornecido.
 
     Returns:
         tuple: (passou_geral_estabilidade (bool), ratio_max_estabilidade (float),
@@ -948,8 +995,10 @@ def verificar_flexocompressao_com_estabilidade(N_sd_c, M_sdx, M_sdy, A, Wx, Wy,
     if props_geom:
         i_x_calc = props_geom.get('i_x')
         i_y_calc = props_geom.get('i_y')
+    elif i_x is not None and i_y is not None:
+        i_x_calc, i_y_calc = i_x, i_y
     else:
-        raise ValueError("props_geom (com i_x, i_y) são necessários para flexocompressão com estabilidade.")
+        raise ValueError("props_geom ou i_x e i_y são necessários para flexocompressão com estabilidade.")
 
     if i_x_calc is None or i_y_calc is None or i_x_calc <= TOL or i_y_calc <= TOL:
         raise ValueError(f"Raios de giração ix ({i_x_calc}) ou iy ({i_y_calc}) inválidos para estabilidade.")
@@ -957,10 +1006,7 @@ def verificar_flexocompressao_com_estabilidade(N_sd_c, M_sdx, M_sdy, A, Wx, Wy,
     if f_c0k is None or f_c0k <= TOL: raise ValueError(f"f_c0k ({f_c0k}) inválido.")
 
     try:
-        lambda_x_val, lambda_rel_x_val = calcular_indices_esbeltez(comprimento_L, Ke_x, i_x_calc, f_c0k, E_005)
-        lambda_y_val, lambda_rel_y_val = calcular_indices_esbeltez(comprimento_L, Ke_y, i_y_calc, f_c0k, E_005)
-        k_cx_val = calcular_coeficiente_reducao_kc(lambda_rel_x_val, beta_c)
-        k_cy_val = calcular_coeficiente_reducao_kc(lambda_rel_y_val, beta_c)
+        lambda_x_val, lambda_y_val, lambda_rel_x_val, lambda_rel_y_val, k_cx_val, k_cy_val = calcular_parametros_estabilidade(comprimento_L, Ke_x, Ke_y, i_x_calc, i_y_calc, f_c0k, E_005, beta_c)
         lambda_max_calculado_val = max(lambda_x_val, lambda_y_val)
     except ValueError as e_stab:
         raise ValueError(f"Erro no cálculo dos parâmetros de estabilidade para flexocompressão: {e_stab}") from e_stab
@@ -1038,8 +1084,8 @@ def verificar_dimensoes_minimas(largura_b, altura_h, tipo_peca="principal_isolad
     elif tipo_peca == "secundaria_multipla":
         area_requerida_mm2, espessura_requerida_mm = 1800, 18  # 18 cm², 1.8 cm
     else:
-        print(f"AVISO: Tipo de peça '{tipo_peca}' desconhecido para dimensões mínimas. "
-              "Usando limites para 'principal_isolada'.")
+        _log.warning("Tipo de peça '%s' desconhecido para dimensões mínimas. "
+                     "Usando limites para 'principal_isolada'.", tipo_peca)
         area_requerida_mm2, espessura_requerida_mm = 5000, 50
 
     area_ok = area_calculada_mm2 >= area_requerida_mm2 - TOL
@@ -1067,7 +1113,7 @@ def obter_beta_M(h_b_ratio):
         float or None: Valor de beta_M, ou None se h_b_ratio for inválido.
     """
     if h_b_ratio is None or not isinstance(h_b_ratio, (int, float)) or h_b_ratio <= TOL:
-        print(f"AVISO: Relação h/b ({h_b_ratio}) inválida para obter beta_M. Retornando None.")
+        _log.warning("Relação h/b (%s) inválida para obter beta_M. Retornando None.", h_b_ratio)
         return None
 
     # Trata limites da tabela
@@ -1092,8 +1138,8 @@ def obter_beta_M(h_b_ratio):
         # Tenta arredondar para o inteiro mais próximo e pegar da tabela
         rounded_h_b = round(h_b_ratio)
         beta_M_fallback = beta_M_tabela.get(rounded_h_b)
-        print(f"AVISO: Não foi possível interpolar beta_M para h/b = {h_b_ratio:.2f}. "
-              f"Usando valor para h/b arredondado para {rounded_h_b}: {beta_M_fallback}")
+        _log.warning("Não foi possível interpolar beta_M para h/b = %.2f. "
+                     "Usando valor para h/b arredondado para %s: %s", h_b_ratio, rounded_h_b, beta_M_fallback)
         return beta_M_fallback
 
     # Interpolação linear: beta_M = y1 + (y2 - y1) * (x - x1) / (x2 - x1)
@@ -1222,12 +1268,10 @@ def verificar_estabilidade_lateral_viga(largura_b_mm, altura_h_mm, L1_mm, E0_med
         resultados['passou'] = False
         resultados['erro'] = f"Erro no cálculo de estabilidade lateral: {type(e).__name__} - {str(e)}"
         resultados['mensagem'] = resultados['erro']
-        # traceback.print_exc() # Para debug do servidor
     except Exception as e_geral:
         resultados['passou'] = False
         resultados['erro'] = f"Erro inesperado na estabilidade lateral: {type(e_geral).__name__} - {str(e_geral)}"
         resultados['mensagem'] = resultados['erro']
-        # traceback.print_exc()
 
     return resultados
 
@@ -1251,7 +1295,7 @@ def calcular_flecha_instantanea_biapoiada_distribuida(q, L, E0_med, I):
         float: Flecha instantânea máxima (mm). Positiva se para baixo.
     """
     if E0_med is None or I is None or E0_med <= TOL or I <= TOL:
-        print(f"AVISO FLECHA: E0_med ({E0_med}) ou I ({I}) inválidos para cálculo. Retornando 0.")
+        _log.warning("Flecha: E0_med (%s) ou I (%s) inválidos para cálculo. Retornando 0.", E0_med, I)
         return 0.0
     if L <= TOL: # Vão nulo, flecha nula
         return 0.0
@@ -1260,9 +1304,37 @@ def calcular_flecha_instantanea_biapoiada_distribuida(q, L, E0_med, I):
     delta = (5.0 * q * (L**4)) / (384.0 * E0_med * I)
     return delta
 
+def calcular_flechas_instantaneas_biapoiada_distribuida(q_x, q_y, L, E0_med, I_x, I_y):
+    """
+    Calcula as flechas instantâneas nas direções x e y de uma viga biapoiada com carga distribuída,
+    avaliando o fator comum 5 * L^4 / (384 * E) uma única vez.
+    A flecha em x (carga q_x) usa I_y e a flecha em y (carga q_y) usa I_x.
+
+    Args:
+        q_x (float): Carga distribuída na direção x (N/mm).
+        q_y (float): Carga distribuída na direção y (N/mm).
+        L (float): Vão da viga (mm).
+        E0_med (float): Módulo de elasticidade médio para ELS (MPa = N/mm²).
+        I_x (float): Momento de inércia em relação ao eixo x (mm⁴).
+        I_y (float): Momento de inércia em relação ao eixo y (mm⁴).
+
+    Returns:
+        tuple: (delta_x, delta_y) em mm, com os mesmos casos-limite de
+               calcular_flecha_instantanea_biapoiada_distribuida.
+    """
+    if E0_med is None or E0_med <= TOL or I_x is None or I_y is None or I_x <= TOL or I_y <= TOL:
+        return (calcular_flecha_instantanea_biapoiada_distribuida(q_x, L, E0_med, I_y),
+                calcular_flecha_instantanea_biapoiada_distribuida(q_y, L, E0_med, I_x))
+    if L <= TOL: # Vão nulo, flechas nulas
+        return 0.0, 0.0
+    k = 5.0 * (L**4) / (384.0 * E0_med)
+    return k * q_x / I_y, k * q_y / I_x
+
+@lru_cache(maxsize=64)
 def obter_coeficiente_fluencia(classe_umidade, tipo_madeira="serrada"):
     """
     Retorna o coeficiente de fluência (phi) conforme Tabela 20 da NBR 7190-1:2022.
+    O resultado é memorizado por (classe_umidade, tipo_madeira), ambos categóricos.
 
     Args:
         classe_umidade (str): Chave da classe de umidade (ex: 'classe_1').
@@ -1278,8 +1350,8 @@ def obter_coeficiente_fluencia(classe_umidade, tipo_madeira="serrada"):
     if tipo_madeira not in kmod_fluencia_valores:
         # Se o tipo de madeira não está na tabela de fluência, tenta usar 'serrada' como fallback
         # ou levanta um erro mais específico se necessário no futuro.
-        print(f"AVISO: Tipo de madeira '{tipo_madeira}' não encontrado na Tabela 20 para fluência. "
-              "Usando valores para 'serrada' como fallback.")
+        _log.warning("Tipo de madeira '%s' não encontrado na Tabela 20 para fluência. "
+                     "Usando valores para 'serrada' como fallback.", tipo_madeira)
         tipo_madeira_usar = "serrada"
     else:
         tipo_madeira_usar = tipo_madeira
@@ -1324,7 +1396,7 @@ def verificar_flecha_final(delta_inst_qp_x, delta_inst_qp_y, phi, L_mm, tipo_vig
     elif tipo_viga == 'balanco':
         delta_limite_final = L_mm / 125.0 # Usando L/125
     else:
-        print(f"AVISO FLECHA: Tipo de viga '{tipo_viga}' não reconhecido. Usando limite L/250.")
+        _log.warning("Flecha: tipo de viga '%s' não reconhecido. Usando limite L/250.", tipo_viga)
         delta_limite_final = L_mm / 250.0
 
     # Flecha final devido à carga quase permanente (incluindo fluência)
@@ -1366,7 +1438,7 @@ def verificar_flecha_instantanea_outra_comb(delta_inst_x, delta_inst_y, L_mm, ti
     elif tipo_viga == 'balanco':
         delta_limite_inst = L_mm / 150.0
     else:
-        print(f"AVISO FLECHA INST: Tipo de viga '{tipo_viga}' não reconhecido. Usando limite L/300.")
+        _log.warning("Flecha instantânea: tipo de viga '%s' não reconhecido. Usando limite L/300.", tipo_viga)
         delta_limite_inst = L_mm / 300.0
 
     # Flecha resultante instantânea (vetorial)
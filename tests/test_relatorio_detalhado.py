@@ -0,0 +1,47 @@
+"""Testes do ETag/If-None-Match da rota /relatorio_detalhado (executar com `python -m unittest`)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+
+# Entrada mínima válida: só a verificação de dimensões, sem esforços
+ENTRADA_VALIDA = {
+    'tipo_tabela': 'estrutural', 'classe_madeira': 'C30', 'classe_carregamento': 'longa',
+    'classe_umidade': 'classe_2', 'comprimento': '3', 'largura_mm': '60', 'altura_mm': '160',
+    'tipo_peca_dim': 'principal_isolada', 'alpha_n': '1.0', 'Ke_x': '1.0', 'Ke_y': '1.0',
+    'tipo_madeira_beta_c': 'serrada', 'verificacoes_selecionadas': 'dimensoes',
+}
+
+
+class TestEtagRelatorioDetalhado(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def test_relatorio_valido_envia_etag(self):
+        resposta = self.client.get('/relatorio_detalhado', query_string=ENTRADA_VALIDA)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIsNotNone(resposta.get_etag()[0])
+
+    def test_etag_igual_responde_304(self):
+        etag = self.client.get('/relatorio_detalhado', query_string=ENTRADA_VALIDA).get_etag()[0]
+        for cabecalho in (f'"{etag}"', f'W/"{etag}"'):
+            resposta = self.client.get('/relatorio_detalhado', query_string=ENTRADA_VALIDA, headers={'If-None-Match': cabecalho})
+            self.assertEqual(resposta.status_code, 304, cabecalho)
+            self.assertEqual(resposta.get_etag()[0], etag)
+
+    def test_etag_diferente_renderiza(self):
+        resposta = self.client.get('/relatorio_detalhado', query_string=ENTRADA_VALIDA, headers={'If-None-Match': '"outro"'})
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_asterisco_nao_dispensa_validacao(self):
+        entrada_invalida = dict(ENTRADA_VALIDA, largura_mm='abc')
+        resposta = self.client.get('/relatorio_detalhado', query_string=entrada_invalida, headers={'If-None-Match': '*'})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.get('/relatorio_detalhado', query_string=ENTRADA_VALIDA, headers={'If-None-Match': '*'})
+        self.assertEqual(resposta.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()